@@ -3,12 +3,64 @@
 """
 from __future__ import print_function
 
+from array import array
+import bisect
+
+# nacini kretanja: (pomeraji (red, kolona), da li se u pravcu klizi do zida ili ivice table)
+MOVES = {'DEFAULT': ([(0, 1), (0, -1), (1, 0), (-1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)], False),
+         'KNIGHT': ([(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (-1, 2), (1, -2), (-1, -2)], False),
+         'QUEEN': ([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, -1), (-1, 1)], True),
+         'ROOK': ([(1, 0), (-1, 0), (0, 1), (0, -1)], True)}
+
+
+def read_rows(file_path, chunk_size=1 << 16):
+    """
+    Redovi tekstualne table (.brd), citanjem fajla u delovima od chunk_size karaktera, pa ni veliki fajl
+    ni lista svih redova nisu u memoriji odjednom. Tabla se zavrsava praznim redom ili krajem fajla.
+    Isto kao read_rows u solutions/board.py (bonus se pokrece samostalno, pa ga ne uvozi).
+    :param file_path: putanja fajla.
+    :param chunk_size: broj karaktera koji se cita odjednom.
+    :returns: generator redova (str, bez znaka za novi red)
+    :raises ValueError: ako redovi nisu iste duzine
+    """
+    cols = None
+    with open(file_path, 'r') as board_f:
+        rest = ''
+        chunk = board_f.read(chunk_size)
+        while chunk != '':
+            buffer = rest + chunk
+            start = 0
+            end = buffer.find('\n')
+            while end >= 0:
+                row = buffer[start:end]
+                if row == '':
+                    return
+                if cols is None:
+                    cols = len(row)
+                elif len(row) != cols:
+                    raise ValueError('Red table {0} ima {1} kolona umesto {2}: {3}'.format(
+                        file_path, len(row), cols, row))
+                yield row
+                start = end + 1
+                end = buffer.find('\n', start)
+            rest = buffer[start:]
+            chunk = board_f.read(chunk_size)
+    if rest != '':  # poslednji red bez znaka za novi red
+        if cols is not None and len(rest) != cols:
+            raise ValueError('Red table {0} ima {1} kolona umesto {2}: {3}'.format(
+                file_path, len(rest), cols, rest))
+        yield rest
+
 
 class Board:
     """
     Klasa koja implementira strukturu table.
+    Pozicije robota, cilja, kutija i portala se pamte u indeksu (positions), pa celije treba menjati
+    preko set_cell; posle direktne izmene data potrebno je pozvati index_positions.
     """
 
+    indexed_elems = ('r', 'g', 'b', 'p')  # elementi ciji se polozaji pamte u indeksu
+
     def __init__(self, rows=20, cols=20):
         self.rows = rows  # broj redova
         self.cols = cols  # broj kolona
@@ -28,19 +80,136 @@ class Board:
                       'p']
         self.data = [['.'] * cols for _ in range(rows)]
         self.text = [[''] * cols for _ in range(rows)]
+        self.positions = {}  # indeks polozaja, kod elementa -> sortirana lista pozicija (red po red)
+        self.index_positions()
+        self.adjacency = {}  # tabele suseda, nacin kretanja -> (pocetci, susedi)
+        self.rays = None  # duzine zraka za klizanje, pravac -> array broja slobodnih polja u tom pravcu
+
+    def invalidate(self, row=None, col=None):
+        """
+        Ponistavanje svega sto je izracunato na osnovu sadrzaja table (poziva se posle svake izmene).
+        Duzine zraka se posle izmene jednog polja samo popravljaju, a posle izmene cele table racunaju ponovo.
+        :param row: red izmenjene celije (None - izmenjena je cela tabla).
+        :param col: kolona izmenjene celije.
+        """
+        self.adjacency = {}
+        if row is None:
+            self.rays = None
+        elif self.rays is not None:
+            self.update_rays(row, col)
+
+    def get_portals(self):
+        return self.positions['p']  # bez kopiranja, samo za citanje
+
+    def get_legal_positions(self, position, moving):
+        """
+        Legalne pozicije iz zadate pozicije: prvo ostali portali, pa potezi redom iz MOVES.
+        :param position: tuple(int, int) pozicija.
+        :param moving: nacin kretanja ('DEFAULT', 'KNIGHT', 'QUEEN' ili 'ROOK').
+        :returns: list(tuple(int, int))
+        """
+        directions, sliding = MOVES[moving]
+        row, col = position
+        idx = row * self.cols + col
+        if not sliding:
+            offsets, neighbours = self.get_adjacency(moving)
+            return neighbours[offsets[idx]:offsets[idx + 1]]
+
+        # klizanje: u svakom pravcu sva polja do zida ili ivice table, bez ponovnog prolaska kroz zrak
+        portals = self.get_portals()
+        positions = [portal for portal in portals if portal != position] if position in portals else []
+        rays = self.get_rays()
+        for d_row, d_col in directions:
+            for step in range(1, rays[(d_row, d_col)][idx] + 1):
+                positions.append((row + step * d_row, col + step * d_col))
+        return positions
+
+    def get_adjacency(self, moving):
+        """
+        Tabela suseda (CSR) za nacine kretanja bez klizanja: legalne pozicije iz polja sa rednim brojem
+        idx = row * cols + col su neighbours[offsets[idx]:offsets[idx + 1]] - prvo ostali portali,
+        pa potezi redom iz MOVES. Pravi se jednom za tablu i nacin kretanja i pamti dok se tabla ne izmeni.
+        :param moving: nacin kretanja ('DEFAULT' ili 'KNIGHT').
+        :returns: (array pocetaka duzine rows * cols + 1, list(tuple(int, int)) suseda)
+        """
+        adjacency = self.adjacency.get(moving)
+        if adjacency is None:
+            adjacency = self.compute_adjacency(moving)
+            self.adjacency[moving] = adjacency
+        return adjacency
+
+    def compute_adjacency(self, moving):
+        directions, _ = MOVES[moving]
+        portals = self.get_portals()
+        offsets = array('l', [0])
+        neighbours = []
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if (row, col) in portals:
+                    neighbours.extend([portal for portal in portals if portal != (row, col)])
+                for d_row, d_col in directions:
+                    new_row = row + d_row
+                    new_col = col + d_col
+                    # ako nova pozicija nije van table i ako nije zid ('w'), ubaci u listu legalnih pozicija
+                    if 0 <= new_row < self.rows and 0 <= new_col < self.cols and self.data[new_row][new_col] != 'w':
+                        neighbours.append((new_row, new_col))
+                offsets.append(len(neighbours))
+        return offsets, neighbours
+
+    def get_rays(self):
+        """
+        Duzine zraka: za svaki pravac kretanja kraljice (QUEEN) i svako polje, broj slobodnih polja
+        u tom pravcu do prvog zida ili ivice table (na indeksu row * cols + col).
+        """
+        if self.rays is None:
+            self.rays = dict((direction, self.compute_rays(direction)) for direction in MOVES['QUEEN'][0])
+        return self.rays
+
+    def compute_rays(self, direction):
+        d_row, d_col = direction
+        rays = array('l', [0] * (self.rows * self.cols))
+        # polja se obilaze tako da je sledece polje u pravcu uvek vec izracunato
+        for row in (range(self.rows - 1, -1, -1) if d_row > 0 else range(self.rows)):
+            for col in (range(self.cols - 1, -1, -1) if d_col > 0 else range(self.cols)):
+                rays[row * self.cols + col] = self.ray_length(rays, row, col, d_row, d_col)
+        return rays
+
+    def ray_length(self, rays, row, col, d_row, d_col):
+        next_row = row + d_row
+        next_col = col + d_col
+        if 0 <= next_row < self.rows and 0 <= next_col < self.cols and self.data[next_row][next_col] != 'w':
+            return 1 + rays[next_row * self.cols + next_col]
+        return 0
+
+    def update_rays(self, row, col):
+        """
+        Posle izmene polja (row, col) menjaju se samo zraci koji prolaze kroz njega: u svakom pravcu
+        polja iza njega (u suprotnom smeru), zakljucno sa prvim zidom.
+        """
+        for (d_row, d_col), rays in self.rays.items():
+            ray_row, ray_col = row, col
+            while 0 <= ray_row < self.rows and 0 <= ray_col < self.cols:
+                rays[ray_row * self.cols + ray_col] = self.ray_length(rays, ray_row, ray_col, d_row, d_col)
+                if self.data[ray_row][ray_col] == 'w' and (ray_row, ray_col) != (row, col):
+                    break
+                ray_row -= d_row
+                ray_col -= d_col
 
     def load_from_file(self, file_path):
         """
-        Ucitavanje table iz fajla.
+        Ucitavanje table iz fajla, dimenzije table (rows, cols) se uzimaju iz fajla
+        (od njih zavise tabele suseda i duzine zraka).
+        Ako redovi nisu iste duzine, tabla ostaje nepromenjena.
         :param file_path: putanja fajla.
+        :raises ValueError: ako redovi nisu iste duzine
         """
-        board_f = open(file_path, 'r')
-        row = board_f.readline().strip('\n')
-        self.data = []
-        while row != '':
-            self.data.append(list(row))
-            row = board_f.readline().strip('\n')
-        board_f.close()
+        data = [list(row) for row in read_rows(file_path)]
+        self.rows = len(data)
+        self.cols = len(data[0]) if len(data) > 0 else 0
+        self.data = data
+        self.text = [[''] * self.cols for _ in range(self.rows)]
+        self.index_positions()
+        self.invalidate()
 
     def save_to_file(self, file_path):
         """
@@ -63,7 +232,33 @@ class Board:
             idx = self.elems.index(self.data[row][col])
             idx += 1
             idx %= len(self.elems)
-            self.data[row][col] = self.elems[idx]
+            self.set_cell(row, col, self.elems[idx])
+            self.invalidate(row, col)
+
+    def set_cell(self, row, col, element):
+        """
+        Upis elementa u celiju table, uz azuriranje indeksa polozaja.
+        Izracunate tabele se ne ponistavaju (za to sluzi invalidate).
+        :param row: red celije.
+        :param col: kolona celije.
+        :param element: kod elementa.
+        """
+        previous = self.data[row][col]
+        if previous in self.positions:
+            self.positions[previous].remove((row, col))
+        self.data[row][col] = element
+        if element in self.positions:
+            bisect.insort(self.positions[element], (row, col))
+
+    def index_positions(self):
+        """
+        Pravljenje indeksa polozaja iz celog sadrzaja table (posle ucitavanja ili ciscenja).
+        """
+        self.positions = dict((element, []) for element in self.indexed_elems)
+        for row, cells in enumerate(self.data):
+            for col, element in enumerate(cells):
+                if element in self.positions:
+                    self.positions[element].append((row, col))
 
     def clear(self):
         """
@@ -73,13 +268,17 @@ class Board:
             for col in range(self.cols):
                 self.data[row][col] = '.'
                 self.text[row][col] = ''
+        self.index_positions()
+        self.invalidate()
 
     def find_position(self, element):
         """
         Pronalazenje specificnog elementa unutar table.
         :param element: kod elementa.
-        :returns: tuple(int, int)
+        :returns: list(tuple(int, int))
         """
+        if element in self.positions:
+            return list(self.positions[element])
         positions = []
         for row in range(self.rows):
             for col in range(self.cols):
@@ -88,15 +287,19 @@ class Board:
         return positions
 
     def move_player_keyboard(self, direction):
-        position = self.find_position('r')
+        robots = self.find_position('r')
+        position = robots[0] if len(robots) > 0 else (None, None)
         new_position = position
         if all([p is not None for p in position]):
             d_row, d_col = Board.get_direction_keyboard(direction)
             new_row = position[0] + d_row
             new_col = position[1] + d_col
             if 0 <= new_row < self.rows and 0 <= new_col < self.cols and self.data[new_row][new_col] != 'w':
-                self.data[position[0]][position[1]] = '.'
-                self.data[new_row][new_col] = 'r'
+                overwritten = self.data[new_row][new_col] != '.'  # robot je prekrio portal ili kutiju
+                self.set_cell(position[0], position[1], '.')
+                self.set_cell(new_row, new_col, 'r')
+                if overwritten:
+                    self.invalidate(new_row, new_col)
                 new_position = new_row, new_col
         return position[0], position[1], new_position[0], new_position[1]
 
@@ -219,9 +219,9 @@ def move_icon(from_position, to_position, has_box=None):
     else:
         t += ',' + f
         f = '.'
-    board.data[from_position[0]][from_position[1]] = f
+    board.set_cell(from_position[0], from_position[1], f)
     update_board(from_position[0], from_position[1])
-    board.data[to_position[0]][to_position[1]] = t
+    board.set_cell(to_position[0], to_position[1], t)
     update_board(to_position[0], to_position[1])
     root.update()
 
@@ -5,7 +5,76 @@ from __future__ import print_function
 
 from collections import deque
 from abc import *
-import sys
+import heapq
+import itertools
+
+
+class PriorityStates(object):
+    """
+    Prioritetni red stanja (binarni heap) za vodjene pretrage.
+    Stanja sa jednakim prioritetom izlaze redom kojim su dodata (stabilno),
+    a izbacivanje i zamena stanja se rade lenjo - zastareli elementi heap-a
+    se samo oznace i preskacu prilikom preuzimanja.
+    Ista klasa postoji u solutions/search.py (tamo i sa peek_priority): bonus se pokrece samostalno iz svog
+    direktorijuma i ne uvozi module iz solutions, pa ispravke treba preneti u obe kopije.
+    """
+
+    def __init__(self, priority, states=()):
+        """
+        :param priority: funkcija koja za stanje vraca prioritet (manji je bolji)
+        :param states: pocetna stanja
+        """
+        self.priority = priority
+        self.heap = []  # elementi su liste [prioritet, redni broj, stanje]
+        self.entries = {}  # unique_hash -> element heap-a
+        self.counter = itertools.count()  # redni broj za stabilno razresavanje jednakih prioriteta
+        self.extend(states)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return (entry[2] for entry in self.entries.values())
+
+    def __contains__(self, state):
+        return state.unique_hash() in self.entries
+
+    def append(self, state):
+        """
+        Dodavanje stanja. Ako je stanje sa istim unique_hash vec u redu,
+        zadrzava se ono sa boljim prioritetom.
+        """
+        state_hash = state.unique_hash()
+        priority = self.priority(state)
+        old_entry = self.entries.get(state_hash)
+        if old_entry is not None:
+            if old_entry[0] <= priority:
+                return
+            old_entry[2] = None  # lenjo brisanje starog elementa
+        entry = [priority, next(self.counter), state]
+        self.entries[state_hash] = entry
+        heapq.heappush(self.heap, entry)
+
+    def extend(self, states):
+        for state in states:
+            self.append(state)
+
+    def remove(self, state):
+        entry = self.entries.pop(state.unique_hash())
+        entry[2] = None
+
+    def pop(self):
+        """
+        Preuzimanje stanja sa najmanjim prioritetom.
+        """
+        while self.heap:
+            priority, _, state = heapq.heappop(self.heap)
+            if state is not None:
+                del self.entries[state.unique_hash()]
+                return state
+        raise IndexError('pop from an empty PriorityStates')
+
+    popleft = pop
 
 
 class Search(object):
@@ -13,6 +82,9 @@ class Search(object):
     Apstraktna klasa za pretragu.
     """
 
+    # da li se stanje koje je vec u listi stanja moze zameniti boljim (samo za prioritetne redove)
+    reopen_states = False
+
     def __init__(self, board):
         self.board = board
 
@@ -25,7 +97,7 @@ class Search(object):
         """
         # inicijalizacija pretrage
         initial_state = initial_state(self.board)  # pocetno stanje
-        states_list = deque([initial_state])  # deque - "brza" lista u Python-u
+        states_list = self.create_states_list([initial_state])  # deque - "brza" lista u Python-u
         states_set = {initial_state.unique_hash()}  # set - za brzu pretragu stanja
 
         processed_list = deque([])  # deque procesiranih stanja
@@ -47,9 +119,10 @@ class Search(object):
             # izgenerisi sledeca moguca stanja
             new_states = curr_state.get_next_states(moving)
             # iz liste sledecih mogucih stanja izbaci ona koja su vec u listi i koja su vec procesirana
+            # (prioritetni red sam odlucuje da li zamenjuje stanje koje je vec u listi)
             new_states = [new_state for new_state in new_states if
                           new_state.unique_hash() not in processed_set and
-                          new_state.unique_hash() not in states_set]
+                          (self.reopen_states or new_state.unique_hash() not in states_set)]
             # dodaj sledeca moguca stanja na kraj liste stanja
             states_list.extend(new_states)
             # dodaj sledeca moguca stanja u set stanja
@@ -64,6 +137,16 @@ class Search(object):
             final_state = final_state.parent
         return reversed(path)
 
+    def create_states_list(self, states):
+        """
+        Pravi strukturu podataka za listu stanja koja cekaju na obradu.
+        Podrazumevano je deque, a vodjene pretrage je menjaju prioritetnim redom.
+
+        :param states: pocetna stanja
+        :return: lista stanja
+        """
+        return deque(states)
+
     @abstractmethod
     def select_state(self, states):
         """
@@ -97,31 +180,25 @@ class IterativeDepthFirstSearch(Search):
 
 
 class GreedySearch(Search):
-    def select_state(self, states):
+    reopen_states = True
+
+    def create_states_list(self, states):
         # TODO 3: Implementirati GS
         # implementirati get_cost metodu u RobotState
-        best_state = None
-        best_heuristic = sys.float_info.max
-        for state in states:
-            heuristic = state.get_cost() 
-            if heuristic < best_heuristic:
-                best_heuristic = heuristic
-                best_state = state
-        states.remove(best_state)
-        return best_state
+        # stanja se cuvaju u heap-u po heuristici, pa je izbor sledeceg stanja O(log n)
+        return PriorityStates(lambda state: state.get_cost(), states)
+
+    def select_state(self, states):
+        return states.pop()
 
 
 class AStarSearch(Search):
-    def select_state(self, states):
+    reopen_states = True
+
+    def create_states_list(self, states):
         # TODO 4: Implementirati A*
         # implementirati get_cost i get_current_cost metode u RobotState
-        best_state = None
-        best_heuristic = sys.float_info.max
-        for state in states:
-            heuristic = state.get_cost() + state.depth
-            if heuristic < best_heuristic:
-                best_heuristic = heuristic
-                best_state = state
-        states.remove(best_state)
-        return best_state
+        return PriorityStates(lambda state: state.get_cost() + state.depth, states)
 
+    def select_state(self, states):
+        return states.pop()
@@ -4,14 +4,16 @@
 from __future__ import print_function
 
 from abc import *
-import math
 import sys
 
 class State(object):
     """
     Apstraktna klasa koja opisuje stanje pretrage.
+    Stanja koriste __slots__, pa podklase koje dodaju atribute treba da ih navedu u svojim __slots__.
     """
 
+    __slots__ = ('board', 'parent', 'position', 'goal_position', 'depth')
+
     @abstractmethod
     def __init__(self, board, parent=None, position=None, goal_position=None):
         """
@@ -77,9 +79,9 @@ class State(object):
     @abstractmethod
     def unique_hash(self):
         """
-        Apstraktna metoda koja treba da vrati string koji je JEDINSTVEN za ovo stanje
+        Apstraktna metoda koja treba da vrati kljuc (int ili str) koji je JEDINSTVEN za ovo stanje
         (u odnosu na ostala stanja).
-        :return: str
+        :return: int ili str
         """
         pass
     
@@ -104,28 +106,87 @@ class State(object):
 
 
 class RobotState(State):
+    __slots__ = ('box_index', 'portals', 'collected_boxes', 'key', 'moving')
+
     def __init__(self, board, parent=None, position=None, goal_position=None):
         super(self.__class__, self).__init__(board, parent, position, goal_position)
         # posle pozivanja super konstruktora, mogu se dodavati "custom" stvari vezani za stanje
         # TODO 6: prosiriti stanje sa informacijom da li je robot pokupio kutiju
-        if self.parent is not None:                                            
-            self.collected_boxes = set(self.parent.collected_boxes)          
-        else:                                                            
-            self.collected_boxes = set()                                        
-        boxes = self.board.find_position('b')
-        for box in boxes:
-            if box == self.position and box not in self.collected_boxes:    
-                self.collected_boxes.add(box)                                 
-                break
-        if len(self.collected_boxes) == len(boxes):                           
+        # Kutije se indeksiraju jednom (u pocetnom stanju) i sva stanja dele indeks (pozicija -> indeks),
+        # a pokupljene kutije su bit maska (int je nepromenljiv, pa se ne kopira)
+        # Isto vazi i za spisak portala (za heuristiku)
+        # Nacin kretanja (za heuristiku) stanje dobija od roditelja, a pocetno stanje ga ne zna do prvog
+        # get_next_states
+        if self.parent is not None:
+            self.box_index = self.parent.box_index
+            self.portals = self.parent.portals
+            self.collected_boxes = self.parent.collected_boxes
+            self.moving = self.parent.moving
+        else:
+            self.box_index = dict((box, idx) for idx, box in enumerate(self.board.find_position('b')))
+            self.portals = tuple(self.board.find_position('p'))
+            self.collected_boxes = 0
+            self.moving = None
+        box = self.box_index.get(self.position)
+        if box is not None:
+            self.collected_boxes |= 1 << box
+        if self.remaining_boxes() == 0:
             self.goal_position = self.board.find_position('g')[0]         
         else:                                                                
             closest_box = (sys.float_info.max, sys.float_info.max)          
-            for box in boxes:
-                if box not in self.collected_boxes:
+            for box, idx in self.box_index.items():
+                if not self.collected_boxes & (1 << idx):
                     if abs(box[0] - self.position[0]) + abs(box[1] - self.position[1]) < abs(closest_box[0] - self.position[0]) + abs(closest_box[1] - self.position[1]):
                         closest_box = box
             self.goal_position = closest_box
+        # kljuc stanja: redni broj polja + maska kutija * broj polja
+        self.key = self.position[0] * self.board.cols + self.position[1] + \
+            self.collected_boxes * self.board.rows * self.board.cols
+
+    def get_next_states(self, moving):
+        self.moving = moving  # naslednici nasledjuju nacin kretanja
+        return State.get_next_states(self, moving)
+
+    def moves_bound(self, source, target):
+        """
+        Donja granica broja poteza od source do target za nacin kretanja (bez zidova i portala):
+        DEFAULT - Chebyshev rastojanje; KNIGHT - skok menja jednu koordinatu najvise za 2, a zbir za 3;
+        QUEEN i ROOK - jedan potez ako je target na istoj liniji (red, kolona, odnosno dijagonala), inace dva.
+        Dok nacin kretanja nije poznat (pocetno stanje), granica je 1 za bilo koje drugo polje.
+        :return: int
+        """
+        d_row, d_col = abs(source[0] - target[0]), abs(source[1] - target[1])
+        if d_row == 0 and d_col == 0:
+            return 0
+        if self.moving == 'DEFAULT':
+            return max(d_row, d_col)
+        if self.moving == 'KNIGHT':
+            return max((max(d_row, d_col) + 1) // 2, (d_row + d_col + 2) // 3)
+        if self.moving == 'QUEEN':
+            return 1 if d_row == 0 or d_col == 0 or d_row == d_col else 2
+        if self.moving == 'ROOK':
+            return 1 if d_row == 0 or d_col == 0 else 2
+        return 1
+
+    def distance_to(self, target):
+        """
+        Dopustiva procena broja poteza do target (moves_bound), ili precica kroz portale ako je kraca:
+        do najblizeg portala, teleportovanje (1 potez) i od najblizeg portala do target.
+        :return: int
+        """
+        distance = self.moves_bound(self.position, target)
+        if len(self.portals) > 1:
+            to_portal = min(self.moves_bound(self.position, portal) for portal in self.portals)
+            from_portal = min(self.moves_bound(portal, target) for portal in self.portals)
+            distance = min(distance, to_portal + 1 + from_portal)
+        return distance
+
+    def remaining_boxes(self):
+        """
+        Broj kutija koje robot jos nije pokupio.
+        :return: int
+        """
+        return len(self.box_index) - bin(self.collected_boxes).count('1')
 
     def get_agent_code(self):
         return 'r'
@@ -134,156 +195,15 @@ class RobotState(State):
         return 'g'
 
     def get_legal_positions(self, moving):
-        # d_rows (delta rows), d_cols (delta columns)
-        # moguci smerovi kretanja robota (desno, levo, dole, gore)
-        if moving == 'DEFAULT':
-            d_rows = [0, 0, 1, -1, -1, -1, 1, 1]
-            d_cols = [1, -1, 0, 0, -1, 1, -1, 1]
-
-            row, col = self.position  # trenutno pozicija
-            new_positions = []
-            portals = self.board.find_position('p')
-            if self.position in portals:                                          
-                for portal in portals:                                           
-                    if portal != self.position:
-                        new_positions.append(portal)
-            for d_row, d_col in zip(d_rows, d_cols):  # za sve moguce smerove
-                new_row = row + d_row  # nova pozicija po redu
-                new_col = col + d_col  # nova pozicija po koloni
-                # ako nova pozicija nije van table i ako nije zid ('w'), ubaci u listu legalnih pozicija
-                if 0 <= new_row < self.board.rows and 0 <= new_col < self.board.cols and self.board.data[new_row][new_col] != 'w':
-                    new_positions.append((new_row, new_col))
-            return new_positions
-        elif moving == 'KNIGHT':
-            d_rows = [2, 2, -2, -2, 1, -1, 1, -1]
-            d_cols = [1, -1, 1, -1, 2, 2, -2, -2]
-
-            row, col = self.position  # trenutno pozicija
-            new_positions = []
-            portals = self.board.find_position('p')
-            if self.position in portals:                                          
-                for portal in portals:                                           
-                    if portal != self.position:
-                        new_positions.append(portal)
-            for d_row, d_col in zip(d_rows, d_cols):  # za sve moguce smerove
-                new_row = row + d_row  # nova pozicija po redu
-                new_col = col + d_col  # nova pozicija po koloni
-                # ako nova pozicija nije van table i ako nije zid ('w'), ubaci u listu legalnih pozicija
-                if 0 <= new_row < self.board.rows and 0 <= new_col < self.board.cols and self.board.data[new_row][new_col] != 'w':
-                    new_positions.append((new_row, new_col))
-            return new_positions
-        elif moving == 'QUEEN':
-            row, col = self.position  # trenutno pozicija
-            new_row = row
-            new_col = col
-            new_positions = []
-            portals = self.board.find_position('p')
-            if self.position in portals:                                          
-                for portal in portals:                                           
-                    if portal != self.position:
-                        new_positions.append(portal)
-            for i in range(row+1, self.board.rows):     #redovi od trenutne pozicije do ivice table
-                # ako nova pozicija nije zid ('w'), ubaci u listu legalnih pozicija, ako naidjes na zid, prekini, ne mozes proci kroz zid :D
-                if self.board.data[i][col] != 'w':
-                    new_positions.append((i, col))
-                else:
-                    break
-            for i in range(row-1, -1, -1):              #redovi od ivice table do trenutne pozicije
-                # ako nova pozicija nije zid ('w'), ubaci u listu legalnih pozicija, ako naidjes na zid, prekini, ne mozes proci kroz zid :D
-                if self.board.data[i][col] != 'w':
-                    new_positions.append((i, col))
-                else:
-                    break
-            for i in range(col+1, self.board.cols):     #kolone od trenutne pozicije do ivice table
-                # ako nova pozicija nije zid ('w'), ubaci u listu legalnih pozicija, ako naidjes na zid, prekini, ne mozes proci kroz zid :D
-                if self.board.data[row][i] != 'w':
-                    new_positions.append((row, i))
-                else:
-                    break
-            for i in range(col-1, -1, -1):              #kolone od ivice table do trenutne pozicije
-                # ako nova pozicija nije zid ('w'), ubaci u listu legalnih pozicija, ako naidjes na zid, prekini, ne mozes proci kroz zid :D
-                if self.board.data[row][i] != 'w':
-                    new_positions.append((row, i))
-                else:
-                    break
-            while(True):                                #kretanja po dijagonali
-                new_row = new_row + 1
-                new_col = new_col + 1
-                if  new_row < self.board.rows and new_col < self.board.cols and self.board.data[new_row][new_col] != 'w':
-                    new_positions.append((new_row, new_col))
-                else:
-                    new_row = row
-                    new_col = col
-                    break
-            while(True):
-                new_row = new_row + 1
-                new_col = new_col - 1
-                if new_row < self.board.rows and 0 <= new_col < self.board.cols and self.board.data[new_row][new_col] != 'w':
-                    new_positions.append((new_row, new_col))
-                else:
-                    new_row = row
-                    new_col = col
-                    break
-            while(True):
-                new_row = new_row - 1
-                new_col = new_col - 1
-                if 0 <=  new_row < self.board.rows and 0 <= new_col < self.board.cols and self.board.data[new_row][new_col] != 'w':
-                    new_positions.append((new_row, new_col))
-                else:
-                    new_row = row
-                    new_col = col
-                    break
-            while(True):
-                new_row = new_row - 1
-                new_col = new_col + 1
-                if 0 <= new_row < self.board.rows and new_col < self.board.cols and self.board.data[new_row][new_col] != 'w':
-                    new_positions.append((new_row, new_col))
-                else:
-                    new_row = row
-                    new_col = col
-                    break
-            return new_positions
-        elif moving == 'ROOK':
-            row, col = self.position  # trenutno pozicija
-            new_positions = []
-            portals = self.board.find_position('p')
-            if self.position in portals:                                          
-                for portal in portals:                                           
-                    if portal != self.position:
-                        new_positions.append(portal)
-            for i in range(row+1, self.board.rows):     #redovi od trenutne pozicije do ivice table
-                # ako nova pozicija nije zid ('w'), ubaci u listu legalnih pozicija, ako naidjes na zid, prekini, ne mozes proci kroz zid :D
-                if self.board.data[i][col] != 'w':
-                    new_positions.append((i, col))
-                else:
-                    break
-            for i in range(row-1, -1, -1):              #redovi od ivice table do trenutne pozicije
-                # ako nova pozicija nije zid ('w'), ubaci u listu legalnih pozicija, ako naidjes na zid, prekini, ne mozes proci kroz zid :D
-                if self.board.data[i][col] != 'w':
-                    new_positions.append((i, col))
-                else:
-                    break
-            for i in range(col+1, self.board.cols):     #kolone od trenutne pozicije do ivice table
-                # ako nova pozicija nije zid ('w'), ubaci u listu legalnih pozicija, ako naidjes na zid, prekini, ne mozes proci kroz zid :D
-                if self.board.data[row][i] != 'w':
-                    new_positions.append((row, i))
-                else:
-                    break
-            for i in range(col-1, -1, -1):              #kolone od ivice table do trenutne pozicije
-                # ako nova pozicija nije zid ('w'), ubaci u listu legalnih pozicija, ako naidjes na zid, prekini, ne mozes proci kroz zid :D
-                if self.board.data[row][i] != 'w':
-                    new_positions.append((row, i))
-                else:
-                    break
-            return new_positions
+        # moguci potezi za svaki nacin kretanja (DEFAULT, KNIGHT, QUEEN, ROOK) i portali su vec
+        # izracunati na tabli (tabela suseda, odnosno duzine zraka za klizanje - board.MOVES)
+        return self.board.get_legal_positions(self.position, moving)
 
     def is_final_state(self):
-        return len(self.board.find_position('b')) == len(self.collected_boxes) and self.position == self.goal_position
+        return self.remaining_boxes() == 0 and self.position == self.goal_position
 
     def unique_hash(self):
-        arr = str([box for box in self.collected_boxes])
-        return str(self.position) + ':' + arr
+        return self.key
         
     def get_cost(self):
-        return math.sqrt((self.position[0] - self.goal_position[0])**2 +
-            (self.position[1] - self.goal_position[1])**2) + (self.board.cols + self.board.rows) * (len(self.board.find_position('b')) - len(self.collected_boxes))
\ No newline at end of file
+        return self.distance_to(self.goal_position) + (self.board.cols + self.board.rows) * self.remaining_boxes()
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Pretrage bez grafickog interfejsa nad svim tablama iz direktorijuma.
+Table se dele procesima, a za svaku tablu se ispisuje jedan red JSON-a:
+tabla, putanja, duzina putanje (broj poteza), broj procesiranih i generisanih stanja i vreme u sekundama.
+
+Primer: python batch.py ../robot/boards --strategy astar --moving orthogonal --workers 4 --output routes.jsonl
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from board import Board, BINARY_EXTENSION
+from search import *
+from state import *
+from hpa import HierarchicalSearch
+from boxes import BoxOrderSearch
+
+# strategije pretrage po imenu iz komandne linije
+STRATEGIES = {'bfs': BreadthFirstSearch,
+              'bibfs': BidirectionalBreadthFirstSearch,
+              'dfs': DepthFirstSearch,
+              'iddfs': IterativeDepthFirstSearch,
+              'idastar': IDAStarSearch,
+              'greedy': GreedySearch,
+              'astar': AStarSearch,
+              'biastar': BidirectionalAStarSearch,
+              'jps': JumpPointSearch,
+              'anytime': AnytimeAStarSearch,
+              'beam': BeamSearch,
+              'hpa': HierarchicalSearch,
+              'boxes': BoxOrderSearch}
+
+# nacini kretanja robota po imenu iz komandne linije
+MOVEMENTS = {'diagonal': RobotState,
+             'orthogonal': OrthogonalRobotState}
+
+
+def find_boards(directory):
+    """
+    Sve table (.brd i binarne) iz direktorijuma, sortirane po imenu.
+    :param directory: putanja direktorijuma.
+    :returns: list(str)
+    """
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if os.path.splitext(name)[1] in ('.brd', BINARY_EXTENSION))
+
+
+def solve(task):
+    """
+    Pretraga jedne table (poziva se u procesu iz grupe procesa).
+    :param task: (putanja table, ime strategije, ime nacina kretanja, vreme po tabli u sekundama ili None)
+    :returns: dict sa rezultatom (ili greskom) za jedan red JSON-a
+    """
+    file_path, strategy, moving, timeout = task
+    result = {'board': file_path, 'strategy': strategy, 'moving': moving}
+    start = time.time()
+    try:
+        board = Board()
+        if file_path.endswith(BINARY_EXTENSION):
+            board.load_from_binary(file_path)
+        else:
+            board.load_from_file(file_path)
+        board.boxes = board.find_elements('b')
+        search = STRATEGIES[strategy](board)
+        search.keep_states = False  # liste stanja nisu potrebne, samo putanja i brojaci
+        deadline = time.time() + timeout if timeout is not None else None
+        path, _, _ = search.search(MOVEMENTS[moving], deadline)
+        if deadline is not None:
+            result['timed_out'] = path is None and time.time() >= deadline
+        path = [list(position) for position in path] if path is not None else None
+        result.update({'path': path,
+                       'length': len(path) - 1 if path is not None else None,
+                       'expanded': search.processed_count,
+                       'generated': search.generated_count})
+    except Exception as e:
+        result['error'] = repr(e)
+    result['time'] = time.time() - start
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pretrage nad svim tablama iz direktorijuma (JSON red po tabli).')
+    parser.add_argument('directory', help='direktorijum sa tablama (.brd ili {0})'.format(BINARY_EXTENSION))
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='astar', help='strategija pretrage')
+    parser.add_argument('--moving', choices=sorted(MOVEMENTS), default='diagonal', help='nacin kretanja robota')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='broj procesa (1 - bez grupe procesa)')
+    parser.add_argument('--timeout', type=float, help='najduze vreme pretrage po tabli u sekundama')
+    parser.add_argument('--output', help='fajl za rezultate (podrazumevano standardni izlaz)')
+    args = parser.parse_args(argv)
+
+    tasks = [(file_path, args.strategy, args.moving, args.timeout) for file_path in find_boards(args.directory)]
+    output = open(args.output, 'w') if args.output else sys.stdout
+    pool = multiprocessing.Pool(args.workers) if args.workers > 1 else None
+    failed = 0
+    try:
+        # rezultati se ispisuju redom kojim su table zadate, cim su gotovi
+        results = pool.imap(solve, tasks) if pool is not None else (solve(task) for task in tasks)
+        for result in results:
+            failed += 'error' in result
+            output.write(json.dumps(result, sort_keys=True) + '\n')
+            output.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
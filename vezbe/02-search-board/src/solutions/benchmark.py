@@ -0,0 +1,154 @@
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+from board import Board
+from search import *
+from state import *
+from parallel import HashDistributedAStarSearch
+
+
+def make_board(size):
+    """
+    Pravi kvadratnu tablu velicine size x size: robot je u gornjem levom uglu,
+    cilj u gornjem desnom, a izmedju njih je zid sa prolazom samo na dnu,
+    tako da lista stanja vodjene pretrage naraste.
+    :param size: broj redova i kolona.
+    :returns: Board
+    """
+    board = Board(rows=size, cols=size)
+    for row in range(size - 1):
+        board.set_cell(row, size // 2, 'w')
+    board.set_cell(0, 0, 'r')
+    board.set_cell(0, size - 1, 'g')
+    board.boxes = []
+    return board
+
+
+class LinearAStarSearch(Search):
+    """
+    A* sa linearnim izborom sledeceg stanja (stara implementacija), samo radi poredjenja.
+    """
+
+    def select_state(self, states):
+        best_state = states[0]
+        best_heuristic = best_state.get_current_cost() + best_state.get_cost()
+        for state in states:
+            heuristic = state.get_current_cost() + state.get_cost()
+            if heuristic < best_heuristic:
+                best_heuristic = heuristic
+                best_state = state
+        states.remove(best_state)
+        return best_state
+
+
+def run(search_class, board, initial_state=RobotState):
+    """
+    Pokrece pretragu i meri vreme.
+    :returns: (vreme u sekundama, broj procesiranih stanja, najveca velicina liste stanja)
+    """
+    search = search_class(board)
+    start = time.time()
+    path, processed, states = search.search(initial_state)
+    end = time.time()
+    return end - start, search.processed_count, len(states)
+
+
+class CostState(object):
+    """
+    Minimalno stanje sa zadatom cenom, za merenje same liste stanja.
+    """
+
+    def __init__(self, idx, cost):
+        self.idx = idx
+        self.cost = cost
+
+    def unique_hash(self):
+        return self.idx
+
+    def get_cost(self):
+        return self.cost
+
+    def get_current_cost(self):
+        return 0
+
+
+def benchmark_select(frontier_sizes, selections=200):
+    """
+    Meri cenu izbora sledeceg stanja u zavisnosti od velicine liste stanja.
+    """
+    print('-' * 15, 'SELECT', '-' * 15)
+    print('{0:>8} {1:>32} {2:>14}'.format('states', 'search', 'us / select'))
+    for frontier_size in frontier_sizes:
+        states = [CostState(idx, random.random()) for idx in range(frontier_size)]
+        for search_class in [LinearAStarSearch, AStarSearch]:
+            search = search_class(None)
+            states_list = search.create_states_list(states)
+            start = time.time()
+            for _ in range(selections):
+                state = search.select_state(states_list)
+                states_list.append(CostState(state.idx, random.random()))
+            end = time.time()
+            print('{0:>8} {1:>32} {2:>14.1f}'.format(
+                frontier_size, search_class.__name__, 1e6 * (end - start) / selections))
+
+
+def benchmark_frontier(sizes):
+    print('-' * 15, 'FRONTIER', '-' * 15)
+    print('{0:>6} {1:>32} {2:>10} {3:>10} {4:>14}'.format('size', 'search', 'time [s]', 'processed', 'us / expansion'))
+    for size in sizes:
+        board = make_board(size)
+        for search_class in [LinearAStarSearch, AStarSearch, GreedySearch,
+                             BreadthFirstSearch, BidirectionalBreadthFirstSearch, BidirectionalAStarSearch,
+                             JumpPointSearch]:
+            elapsed, processed, _ = run(search_class, board)
+            print('{0:>6} {1:>32} {2:>10.3f} {3:>10} {4:>14.1f}'.format(
+                size, search_class.__name__, elapsed, processed, 1e6 * elapsed / max(processed, 1)))
+
+
+def benchmark_states(boxes_counts, count=20000):
+    """
+    Meri cenu pravljenja stanja (samo konstruktor, bez trazenja legalnih pozicija)
+    i memoriju jednog stanja u zavisnosti od broja kutija.
+    """
+    print('-' * 15, 'STATES', '-' * 15)
+    print('{0:>8} {1:>14} {2:>14}'.format('boxes', 'us / state', 'bytes / state'))
+    for boxes_count in boxes_counts:
+        board = make_board(max(10, boxes_count + 2))
+        board.boxes = [(board.rows - 1, col) for col in range(boxes_count)]
+        state = RobotState(board)
+        positions = state.get_legal_positions()
+        start = time.time()
+        for idx in range(count):
+            RobotState(board, state, positions[idx % len(positions)], state.goal_position)
+        end = time.time()
+        size = sys.getsizeof(state) + (sys.getsizeof(state.__dict__) if hasattr(state, '__dict__') else 0)
+        print('{0:>8} {1:>14.2f} {2:>14}'.format(boxes_count, 1e6 * (end - start) / count, size))
+
+
+def benchmark_parallel(workers_counts, size=20, boxes_count=8):
+    """
+    Meri HDA* u zavisnosti od broja procesa, na tabli sa kutijama (u poredjenju sa AStarSearch).
+    """
+    print('-' * 15, 'PARALLEL', '-' * 15)
+    print('{0:>8} {1:>10} {2:>10} {3:>10}'.format('workers', 'time [s]', 'processed', 'speedup'))
+    board = make_board(size)
+    board.boxes = [(size - 1, col) for col in range(1, boxes_count + 1)]
+    base, processed, _ = run(AStarSearch, board)
+    print('{0:>8} {1:>10.3f} {2:>10} {3:>10.2f}'.format('A*', base, processed, 1.0))
+    for workers in workers_counts:
+        search = HashDistributedAStarSearch(board, workers=workers)
+        start = time.time()
+        search.search(RobotState)
+        elapsed = time.time() - start
+        print('{0:>8} {1:>10.3f} {2:>10} {3:>10.2f}'.format(workers, elapsed, search.processed_count, base / elapsed))
+
+
+if __name__ == '__main__':
+    board_sizes = [int(arg) for arg in sys.argv[1:]] or [10, 20, 40]
+    benchmark_select([100, 1000, 10000, 100000])
+    benchmark_frontier(board_sizes)
+    benchmark_states([0, 4, 16])
+    benchmark_parallel([1, 2, 4])
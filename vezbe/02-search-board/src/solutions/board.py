@@ -1,15 +1,114 @@
 from __future__ import print_function
 
+from array import array
+import bisect
+from collections import deque, OrderedDict
+import os
+import struct
+import sys
 
-class Board:
+try:
+    import numpy
+except ImportError:  # NumPy nije obavezan, bez njega se koristi samo Board
+    numpy = None
+
+# binarni format table: zaglavlje (oznaka formata, verzija, broj redova, broj kolona, broj elemenata),
+# tabela elemenata (karakter elementa za svaki kod), pa sve celije red po red, jedan bajt (kod) po celiji
+BINARY_MAGIC = b'BRDB'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sBIIB')
+BINARY_EXTENSION = '.brdb'
+
+
+def read_binary_header(board_f):
+    """
+    Citanje zaglavlja binarne table.
+    :param board_f: fajl otvoren za citanje u binarnom rezimu.
+    :returns: (broj redova, broj kolona, karakteri elemenata po kodovima, pomeraj pocetka celija u fajlu)
+    """
+    header = board_f.read(BINARY_HEADER.size)
+    if len(header) < BINARY_HEADER.size:
+        raise ValueError('Fajl {0} nije binarna tabla'.format(board_f.name))
+    magic, version, rows, cols, count = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError('Fajl {0} nije binarna tabla (verzija {1})'.format(board_f.name, BINARY_VERSION))
+    elements = board_f.read(count).decode('ascii')
+    return rows, cols, elements, BINARY_HEADER.size + count
+
+
+def write_binary_header(board_f, rows, cols, elements):
+    board_f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, rows, cols, len(elements)))
+    board_f.write(''.join(elements).encode('ascii'))
+
+
+def read_rows(file_path, chunk_size=1 << 16):
+    """
+    Redovi tekstualne table (.brd), citanjem fajla u delovima od chunk_size karaktera, pa ni veliki fajl
+    ni lista svih redova nisu u memoriji odjednom. Tabla se zavrsava praznim redom ili krajem fajla.
+    :param file_path: putanja fajla.
+    :param chunk_size: broj karaktera koji se cita odjednom.
+    :returns: generator redova (str, bez znaka za novi red)
+    :raises ValueError: ako redovi nisu iste duzine
+    """
+    cols = None
+    with open(file_path, 'r') as board_f:
+        rest = ''
+        chunk = board_f.read(chunk_size)
+        while chunk != '':
+            buffer = rest + chunk
+            start = 0
+            end = buffer.find('\n')
+            while end >= 0:
+                row = buffer[start:end]
+                if row == '':
+                    return
+                if cols is None:
+                    cols = len(row)
+                elif len(row) != cols:
+                    raise ValueError('Red table {0} ima {1} kolona umesto {2}: {3}'.format(
+                        file_path, len(row), cols, row))
+                yield row
+                start = end + 1
+                end = buffer.find('\n', start)
+            rest = buffer[start:]
+            chunk = board_f.read(chunk_size)
+    if rest != '':  # poslednji red bez znaka za novi red
+        if cols is not None and len(rest) != cols:
+            raise ValueError('Red table {0} ima {1} kolona umesto {2}: {3}'.format(
+                file_path, len(rest), cols, rest))
+        yield rest
+
+
+def convert_to_binary(source, target=None):
+    """
+    Prevodjenje tekstualne table (.brd) u binarni format.
+    :param source: putanja .brd fajla.
+    :param target: putanja binarnog fajla (podrazumevano ista putanja sa ekstenzijom BINARY_EXTENSION).
+    :returns: putanja binarnog fajla
+    """
+    if target is None:
+        target = os.path.splitext(source)[0] + BINARY_EXTENSION
+    board = NumpyBoard() if numpy is not None else Board()
+    board.load_from_file(source)
+    board.save_to_binary(target)
+    return target
+
+
+class Board(object):
     """
     Klasa koja implementira strukturu table.
+    Pozicije robota, cilja, portala i kutija se pamte u indeksu (positions), a kodovi svih celija u nizu
+    (get_cells), pa celije treba menjati preko set_cell; posle direktne izmene data potrebno je pozvati
+    index_positions.
     """
 
+    indexed_elems = ('r', 'g', 'p', 'b')  # elementi ciji se polozaji pamte u indeksu
+    distances_size = 16  # najveci broj zapamcenih polja rastojanja (izbacuje se najdavnije korisceno)
+
     def __init__(self, rows=20, cols=20):
         self.rows = rows  # broj redova
         self.cols = cols  # broj kolona
-        self.boxes = []   # spisak svih kutija
+        self.boxes = []   # spisak svih kutija (postavlja i indeks kutija, box_index)
 
         # ---------------
         # . = empty
@@ -25,21 +124,56 @@ class Board:
                       'g',
                       'p',
                       'b']
-        self.data = [['.'] * cols for _ in range(rows)]
-        self.text = [[''] * cols for _ in range(rows)]
+        self.allocate()
+        self.positions = {}  # indeks polozaja, kod elementa -> sortirana lista pozicija (red po red)
+        self.index_positions()
+        self.distances = OrderedDict()  # polja rastojanja, (cilj, smerovi kretanja) -> lista rastojanja
+        self.portal_distances = {}  # polja rastojanja do portala, (zidovi, smerovi kretanja) -> lista rastojanja
+        self.portal_exit = None  # poslednje rastojanje na mrezi od portala do cilja, ((cilj, dijagonale), rastojanje)
+        self.landmarks = {}  # orijentiri, (broj orijentira, smerovi kretanja) -> (lista pozicija, polja rastojanja)
+        self.adjacency = {}  # tabele suseda, smerovi kretanja -> (pocetci, susedi)
+        self.adjacency_portals = []  # portali (redni brojevi celija) u tabelama suseda
+        self.layout_cells = set()  # celije (redni brojevi) kojima je set_cell promenio zid ili portal
+        self.listeners = []  # funkcije listener(row, col) koje se pozivaju posle izmene table
+
+    @property
+    def boxes(self):
+        return self._boxes
+
+    @boxes.setter
+    def boxes(self, boxes):
+        # kutije se indeksiraju jednom, a stanja pamte pokupljene kutije kao bit masku po ovim indeksima;
+        # tuple, jer bi izmena liste u mestu ostavila zastareo indeks
+        self._boxes = tuple(boxes)
+        self.box_index = dict((box, idx) for idx, box in enumerate(self._boxes))  # pozicija -> indeks kutije
+
+    def allocate(self):
+        """
+        Prazan sadrzaj i tekst celija za dimenzije rows x cols.
+        """
+        self.data = [['.'] * self.cols for _ in range(self.rows)]
+        self.text = [[''] * self.cols for _ in range(self.rows)]
+
+    def __getstate__(self):
+        # listeneri pripadaju objektima iz procesa koji je napravio tablu, pa se ne prenose (npr. u druge procese)
+        state = self.__dict__.copy()
+        state['listeners'] = []
+        return state
 
     def load_from_file(self, file_path):
         """
-        Ucitavanje table iz fajla.
+        Ucitavanje table iz fajla, dimenzije table (rows, cols) se uzimaju iz fajla.
+        Ako redovi nisu iste duzine, tabla ostaje nepromenjena.
         :param file_path: putanja fajla.
+        :raises ValueError: ako redovi nisu iste duzine
         """
-        board_f = open(file_path, 'r')
-        row = board_f.readline().strip('\n')
-        self.data = []
-        while row != '':
-            self.data.append(list(row))
-            row = board_f.readline().strip('\n')
-        board_f.close()
+        data = [list(row) for row in read_rows(file_path)]
+        self.rows = len(data)
+        self.cols = len(data[0]) if len(data) > 0 else 0
+        self.data = data
+        self.text = [[''] * self.cols for _ in range(self.rows)]
+        self.index_positions()
+        self.invalidate()
 
     def save_to_file(self, file_path):
         """
@@ -52,6 +186,42 @@ class Board:
                 f.write(''.join(self.data[row]) + '\n')
             f.close()
 
+    def load_from_binary(self, file_path):
+        """
+        Ucitavanje table iz binarnog fajla (BINARY_HEADER), dimenzije se uzimaju iz zaglavlja.
+        Celije se citaju odjednom i prevode iz kodova u karaktere pre deljenja na redove.
+        :param file_path: putanja fajla.
+        """
+        with open(file_path, 'rb') as board_f:
+            rows, cols, elements, _ = read_binary_header(board_f)
+            cells = board_f.read(rows * cols)
+        if len(cells) != rows * cols:
+            raise ValueError('Binarna tabla {0} je skracena'.format(file_path))
+        if len(cells.translate(None, bytes(bytearray(range(len(elements)))))) > 0:  # ostaju samo nepoznati kodovi
+            raise ValueError('Nepoznat kod elementa u tabli {0}'.format(file_path))
+        table = bytearray(range(256))
+        for code, element in enumerate(elements):
+            table[code] = ord(element)
+        cells = cells.translate(bytes(table)).decode('ascii')
+        self.rows, self.cols = rows, cols
+        self.data = [list(cells[row * cols:(row + 1) * cols]) for row in range(rows)]
+        self.text = [[''] * cols for _ in range(rows)]
+        self.index_positions()
+        self.invalidate()
+
+    def save_to_binary(self, file_path):
+        """
+        Snimanje table u binarni fajl (BINARY_HEADER).
+        :param file_path: putanja fajla.
+        """
+        table = bytearray(range(256))
+        for code, element in enumerate(self.elems):
+            table[ord(element)] = code
+        with open(file_path, 'wb') as f:
+            write_binary_header(f, len(self.data), len(self.data[0]) if len(self.data) > 0 else 0, self.elems)
+            for cells in self.data:
+                f.write(''.join(cells).encode('ascii').translate(bytes(table)))
+
     def switch_cell(self, row, col):
         """
         Izmena sadrzaja celije table.
@@ -62,7 +232,40 @@ class Board:
             idx = self.elems.index(self.data[row][col])
             idx += 1
             idx %= len(self.elems)
-            self.data[row][col] = self.elems[idx]
+            self.set_cell(row, col, self.elems[idx])
+            self.invalidate(row, col)
+
+    def set_cell(self, row, col, element):
+        """
+        Upis elementa u celiju table, uz azuriranje indeksa polozaja.
+        Izracunata rastojanja se ne ponistavaju (za to sluzi invalidate).
+        :param row: red celije.
+        :param col: kolona celije.
+        :param element: kod elementa.
+        """
+        previous = self.data[row][col]
+        if previous in self.positions:
+            self.positions[previous].remove((row, col))
+        self.data[row][col] = element
+        if element in self.positions:
+            bisect.insort(self.positions[element], (row, col))
+        if self.cells is not None:
+            code = self.element_code(element)
+            if self.changes_layout(self.cells[row * self.cols + col], code):
+                self.layout_cells.add(row * self.cols + col)
+            self.cells[row * self.cols + col] = code
+
+    def index_positions(self):
+        """
+        Pravljenje indeksa polozaja iz celog sadrzaja table (posle ucitavanja ili ciscenja).
+        Niz kodova celija (get_cells) se pravi ponovo kada zatreba.
+        """
+        self.cells = None
+        self.positions = dict((element, []) for element in self.indexed_elems)
+        for row, cells in enumerate(self.data):
+            for col, element in enumerate(cells):
+                if element in self.positions:
+                    self.positions[element].append((row, col))
 
     def clear(self):
         """
@@ -72,6 +275,8 @@ class Board:
             for col in range(self.cols):
                 self.data[row][col] = '.'
                 self.text[row][col] = ''
+        self.index_positions()
+        self.invalidate()
 
     def find_position(self, element):
         """
@@ -79,6 +284,9 @@ class Board:
         :param element: kod elementa.
         :returns: tuple(int, int)
         """
+        positions = self.positions.get(element)
+        if positions is not None:
+            return positions[0] if len(positions) > 0 else (None, None)
         for row in range(self.rows):
             for col in range(self.cols):
                 if self.data[row][col] == element:
@@ -91,6 +299,8 @@ class Board:
         :param element: kod elementa.
         :returns: list(tuple(int, int))
         """
+        if element in self.positions:
+            return list(self.positions[element])
         elements = []
         for row in range(self.rows):
             for col in range(self.cols):
@@ -98,6 +308,381 @@ class Board:
                     elements.append((row, col))
         return elements
 
+    def get_wall_mask(self):
+        """
+        Maska zidova: True za celije koje su zid.
+        :returns: list(list(bool))
+        """
+        return [[cell == 'w' for cell in cells] for cells in self.data]
+
+    def element_code(self, element):
+        """
+        Kod elementa (indeks u elems). Slozene celije iz animacije u igri (npr. 'p,r')
+        imaju kod prvog elementa, a nepoznati elementi kod praznog polja.
+        :param element: kod elementa.
+        :returns: int
+        """
+        element = element.split(',')[0]
+        return self.elems.index(element) if element in self.elems else 0
+
+    def changes_layout(self, previous, code):
+        """
+        Da li zamena koda celije menja zidove ili portale, od kojih zavise tabele suseda i polja rastojanja
+        (robot, cilj i kutije ih ne menjaju).
+        :param previous: stari kod celije.
+        :param code: novi kod celije.
+        :returns: bool
+        """
+        layout = (self.elems.index('w'), self.elems.index('p'))
+        return previous != code and (previous in layout or code in layout)
+
+    def get_cells(self):
+        """
+        Kodovi svih celija (element_code) u jednom nizu, celija (row, col) je na indeksu row * cols + col.
+        Petlje koje obilaze celu tablu citaju ovaj niz umesto data (brze je, narocito kod NumpyBoard).
+        Pravi se jednom, a set_cell ga azurira.
+        :returns: bytearray duzine rows * cols
+        """
+        if self.cells is None:
+            codes = dict((element, code) for code, element in enumerate(self.elems))
+            self.cells = bytearray(codes[cell] if cell in codes else self.element_code(cell)
+                                   for cells in self.data for cell in cells)
+        return self.cells
+
+    def invalidate(self, row=None, col=None):
+        """
+        Ponistavanje svega sto je izracunato na osnovu sadrzaja table.
+        Poziva se posle svake izmene table, a listeneri dobijaju izmenjenu celiju
+        (ili None, None ako se izmenila cela tabla).
+        Izmena jedne celije koja ne menja zidove ni portale (npr. pomeren robot ili cilj) ne ponistava nista,
+        pa polja rastojanja i orijentiri ostaju za sledece upite. Ako se zidovi ili portali promene,
+        tabele suseda se ne prave ponovo, nego im se azuriraju isecci izmenjenih celija i celija
+        iz kojih se na njih stize (i svih portala, ako su se portali promenili), a polja
+        rastojanja do portala bez zidova ostaju dok se portali ne promene.
+        :param row: red izmenjene celije.
+        :param col: kolona izmenjene celije.
+        """
+        if row is None or self.cells is None:
+            self.cells = None
+            self.adjacency = {}
+            self.layout_cells = set()
+            changed = True
+        else:
+            # celija je mogla biti upisana i direktno u data, pa se kod ne uzima samo od set_cell
+            idx = row * self.cols + col
+            code = self.element_code(self.data[row][col])
+            if self.changes_layout(self.cells[idx], code):
+                self.layout_cells.add(idx)
+            self.cells[idx] = code
+            changed = len(self.layout_cells) > 0
+        if changed:
+            portals = [position[0] * self.cols + position[1] for position in self.find_elements('p')]
+            for idx in sorted(self.layout_cells):
+                for (d_rows, d_cols), adjacency in self.adjacency.items():
+                    self.update_adjacency(adjacency, idx, d_rows, d_cols, portals)
+            self.layout_cells = set()
+            self.distances = OrderedDict()
+            if row is not None and portals == self.adjacency_portals:
+                self.portal_distances = dict((key, distances) for key, distances in self.portal_distances.items()
+                                             if not key[0])
+            else:
+                self.portal_distances = {}
+            self.adjacency_portals = portals
+            self.portal_exit = None
+            self.landmarks = {}
+        for listener in self.listeners:
+            listener(row, col)
+
+    def get_adjacency(self, d_rows, d_cols):
+        """
+        Tabela suseda (CSR): susedi polja sa rednim brojem idx = row * cols + col su
+        neighbours[offsets[idx]:offsets[idx + 1]], redom kojim ih daju smerovi kretanja, pa portali.
+        Pravi se jednom za tablu i smerove kretanja i pamti dok se tabla ne izmeni.
+        :param d_rows: pomeraji po redovima za moguce smerove kretanja.
+        :param d_cols: pomeraji po kolonama za moguce smerove kretanja.
+        :returns: (array('i') pocetaka duzine rows * cols + 1, array('i') rednih brojeva suseda);
+                  pozicija suseda je divmod(redni broj, cols)
+        """
+        key = (tuple(d_rows), tuple(d_cols))
+        adjacency = self.adjacency.get(key)
+        if adjacency is None:
+            self.adjacency_portals = [row * self.cols + col for row, col in self.find_elements('p')]
+            adjacency = self.compute_adjacency(d_rows, d_cols)
+            self.adjacency[key] = adjacency
+        return adjacency
+
+    def compute_adjacency(self, d_rows, d_cols):
+        # isto sto i cell_neighbours za svaku celiju, ali bez poziva po celiji (cela tabla odjednom)
+        rows, cols, cells = self.rows, self.cols, self.get_cells()
+        wall, portal = self.elems.index('w'), self.elems.index('p')
+        portals = [row * cols + col for row, col in self.find_elements('p')]
+        offsets = array('i', [0])
+        neighbours = array('i')
+        idx = 0
+        for row in range(rows):
+            for col in range(cols):
+                if cells[idx] != wall:
+                    start = len(neighbours)
+                    for d_row, d_col in zip(d_rows, d_cols):
+                        new_row = row + d_row
+                        new_col = col + d_col
+                        if 0 <= new_row < rows and 0 <= new_col < cols and \
+                                cells[new_row * cols + new_col] != wall:
+                            neighbours.append(new_row * cols + new_col)
+                    if cells[idx] == portal:
+                        # svi ostali portali koji nisu vec susedna polja
+                        moves = neighbours[start:]
+                        neighbours.extend(array('i', [other for other in portals
+                                                      if other != idx and other not in moves]))
+                offsets.append(len(neighbours))
+                idx += 1
+        return offsets, neighbours
+
+    def cell_neighbours(self, idx, d_rows, d_cols, portals):
+        """
+        Isecak tabele suseda za jednu celiju: susedi redom smerova kretanja, pa ostali portali.
+        :param idx: redni broj celije (row * cols + col).
+        :param portals: redni brojevi svih portala.
+        :returns: array('i') rednih brojeva suseda
+        """
+        rows, cols, cells = self.rows, self.cols, self.get_cells()
+        wall = self.elems.index('w')
+        neighbours = array('i')
+        if cells[idx] == wall:
+            return neighbours
+        row, col = divmod(idx, cols)
+        for d_row, d_col in zip(d_rows, d_cols):
+            new_row = row + d_row
+            new_col = col + d_col
+            if 0 <= new_row < rows and 0 <= new_col < cols and cells[new_row * cols + new_col] != wall:
+                neighbours.append(new_row * cols + new_col)
+        if cells[idx] == self.elems.index('p'):
+            # svi ostali portali koji nisu vec susedna polja
+            neighbours.extend(array('i', [other for other in portals if other != idx and other not in neighbours]))
+        return neighbours
+
+    def update_adjacency(self, adjacency, idx, d_rows, d_cols, portals):
+        """
+        Azuriranje tabele suseda posle izmene jedne celije: ponovo se racunaju isecci celije
+        i celija iz kojih se na nju stize jednim potezom (sve su u opsegu od najvise dva reda),
+        a ako su se portali promenili, i isecci svih starih i novih portala.
+        :param adjacency: (pocetci, susedi) iz get_adjacency, menja se u mestu.
+        :param idx: redni broj izmenjene celije.
+        :param portals: redni brojevi svih portala posle izmene.
+        """
+        row, col = divmod(idx, self.cols)
+        local = [idx] + [(row - d_row) * self.cols + col - d_col for d_row, d_col in zip(d_rows, d_cols)
+                         if 0 <= row - d_row < self.rows and 0 <= col - d_col < self.cols]
+        first, last = min(local), max(local)
+        self.splice_adjacency(adjacency, first, last, d_rows, d_cols, portals)
+        if portals != self.adjacency_portals:
+            for portal in sorted(set(portals) | set(self.adjacency_portals)):
+                if not first <= portal <= last:
+                    self.splice_adjacency(adjacency, portal, portal, d_rows, d_cols, portals)
+
+    def splice_adjacency(self, adjacency, first, last, d_rows, d_cols, portals):
+        """
+        Zamena isecaka celija first..last (ukljucujuci) u tabeli suseda ponovo izracunatim,
+        uz pomeranje pocetaka svih celija iza njih.
+        """
+        offsets, neighbours = adjacency
+        start, end = offsets[first], offsets[last + 1]
+        replacement = array('i')
+        ends = array('i')
+        for idx in range(first, last + 1):
+            replacement.extend(self.cell_neighbours(idx, d_rows, d_cols, portals))
+            ends.append(start + len(replacement))
+        neighbours[start:end] = replacement
+        offsets[first + 1:last + 2] = ends
+        shift = len(replacement) - (end - start)
+        if shift != 0:
+            offsets[last + 2:] = array('i', [offset + shift for offset in offsets[last + 2:]])
+
+    def get_distances(self, target, d_rows, d_cols):
+        """
+        Polje rastojanja: za svako polje table najmanji broj poteza do cilja (target),
+        uz zadate smerove kretanja, zidove i portale (portal vodi na bilo koji drugi portal).
+        Racuna se jednom pretragom u sirinu unazad od cilja i pamti dok se tabla ne izmeni
+        (najvise distances_size polja, pa jedna tabla moze imati mnogo ciljeva).
+        :param target: tuple(int, int) ciljno polje.
+        :param d_rows: pomeraji po redovima za moguce smerove kretanja.
+        :param d_cols: pomeraji po kolonama za moguce smerove kretanja.
+        :returns: list(int) duzine rows * cols, rastojanje polja (row, col) je na indeksu row * cols + col,
+                  a -1 znaci da se do cilja ne moze stici
+        """
+        key = (target, tuple(d_rows), tuple(d_cols))
+        distances = self.cached_distances(key)
+        if distances is None:
+            distances = self.compute_distances(target, d_rows, d_cols)
+            self.cache_distances(key, distances)
+        return distances
+
+    def cached_distances(self, key):
+        """
+        :return: zapamceno polje rastojanja ili None
+        """
+        distances = self.distances.pop(key, None)
+        if distances is not None:
+            self.distances[key] = distances  # polje postaje najskorije korisceno
+        return distances
+
+    def cache_distances(self, key, distances):
+        self.distances[key] = distances
+        if len(self.distances) > self.distances_size:
+            self.distances.popitem(last=False)
+
+    def compute_distances(self, target, d_rows, d_cols):
+        rows, cols, cells = self.rows, self.cols, self.get_cells()
+        wall, portal = self.elems.index('w'), self.elems.index('p')
+        distances = [-1] * (rows * cols)
+        if target is None or target[0] is None or cells[target[0] * cols + target[1]] == wall:
+            return distances
+        portals = self.find_elements('p')
+        portals_reached = False
+        distances[target[0] * cols + target[1]] = 0
+        queue = deque([target])
+        while len(queue) > 0:
+            row, col = queue.popleft()
+            distance = distances[row * cols + col] + 1
+            # prethodnici polja: polja iz kojih se jednim potezom stize na ovo polje
+            for d_row, d_col in zip(d_rows, d_cols):
+                prev_row = row - d_row
+                prev_col = col - d_col
+                if 0 <= prev_row < rows and 0 <= prev_col < cols and cells[prev_row * cols + prev_col] != wall and \
+                        distances[prev_row * cols + prev_col] == -1:
+                    distances[prev_row * cols + prev_col] = distance
+                    queue.append((prev_row, prev_col))
+            # na portal se stize sa bilo kog drugog portala, pa su svi portali dovoljni samo jednom
+            if not portals_reached and cells[row * cols + col] == portal:
+                portals_reached = True
+                for prev_row, prev_col in portals:
+                    if distances[prev_row * cols + prev_col] == -1:
+                        distances[prev_row * cols + prev_col] = distance
+                        queue.append((prev_row, prev_col))
+        return distances
+
+    def get_portal_distances(self, d_rows, d_cols, walls=True):
+        """
+        Polje rastojanja do najblizeg portala, bez teleportovanja (samo hodanjem).
+        Racuna se jednom za tablu i smerove kretanja (ne zavisi od cilja) i pamti dok se tabla ne izmeni.
+        Pretpostavlja da su potezi simetricni, pa je to i rastojanje od najblizeg portala.
+        :param d_rows: pomeraji po redovima za moguce smerove kretanja.
+        :param d_cols: pomeraji po kolonama za moguce smerove kretanja.
+        :param walls: da li se zidovi uzimaju u obzir (ako ne, rastojanje je samo rastojanje na mrezi).
+        :returns: list(int) duzine rows * cols; sve -1 ako na tabli nema bar dva portala (nema teleportovanja)
+        """
+        key = (walls, tuple(d_rows), tuple(d_cols))
+        distances = self.portal_distances.get(key)
+        if distances is not None:
+            return distances
+
+        rows, cols, cells = self.rows, self.cols, self.get_cells()
+        wall = self.elems.index('w')
+        distances = [-1] * (rows * cols)
+        portals = self.find_elements('p')
+        if len(portals) > 1:
+            for row, col in portals:
+                distances[row * cols + col] = 0
+            queue = deque(portals)
+            while len(queue) > 0:
+                row, col = queue.popleft()
+                distance = distances[row * cols + col] + 1
+                for d_row, d_col in zip(d_rows, d_cols):
+                    prev_row = row - d_row
+                    prev_col = col - d_col
+                    if 0 <= prev_row < rows and 0 <= prev_col < cols and \
+                            (not walls or cells[prev_row * cols + prev_col] != wall) and \
+                            distances[prev_row * cols + prev_col] == -1:
+                        distances[prev_row * cols + prev_col] = distance
+                        queue.append((prev_row, prev_col))
+        self.portal_distances[key] = distances
+        return distances
+
+    def get_grid_estimate(self, position, goal, d_rows, d_cols, walls=True):
+        """
+        Dopustiva procena broja poteza od position do goal bez pretrage po cilju: rastojanje na mrezi
+        (Chebyshev za kretanje sa dijagonalama, Menhetn za 4 smera) ili precica - hodanje do najblizeg portala
+        (polje get_portal_distances), teleportovanje (1 potez) i rastojanje na mrezi od najblizeg portala
+        do cilja, sto je manje. Deo od portala do cilja ne gleda zidove, da bi procena ostala konzistentna
+        i posle teleportovanja; racuna se jednom po cilju. Bez bar dva portala nema teleportovanja,
+        pa ni polja rastojanja.
+        :param walls: da li hodanje do portala uzima u obzir zidove; bez zidova procena ne zavisi
+                      od zidova, pa ostaje ista i kada se zidovi menjaju.
+        :returns: int
+        """
+        diagonal = len(d_rows) > 4
+        d_row, d_col = abs(position[0] - goal[0]), abs(position[1] - goal[1])
+        estimate = max(d_row, d_col) if diagonal else d_row + d_col
+        portals = self.positions['p']
+        if len(portals) < 2:
+            return estimate
+
+        to_portal = self.get_portal_distances(d_rows, d_cols, walls)[position[0] * self.cols + position[1]]
+        if to_portal < 0:
+            return estimate
+        if self.portal_exit is None or self.portal_exit[0] != (goal, diagonal):
+            from_portal = min(max(abs(row - goal[0]), abs(col - goal[1])) if diagonal else
+                              abs(row - goal[0]) + abs(col - goal[1]) for row, col in portals)
+            self.portal_exit = ((goal, diagonal), from_portal)
+        return min(estimate, to_portal + 1 + self.portal_exit[1])
+
+    def get_landmarks(self, count, d_rows, d_cols):
+        """
+        Izbor orijentira (landmarks) za ALT heuristiku metodom najdalje tacke: prvi orijentir
+        je polje najdalje od robota (ili od prvog slobodnog polja), a svaki sledeci je polje
+        cije je rastojanje do najblizeg vec izabranog orijentira najvece.
+        Za svaki orijentir se pamti polje rastojanja (uz orijentire, ne medju poljima ciljeva koja se
+        izbacuju), pa priprema vazi za bilo koji par pocetak/cilj dok se tabla ne izmeni.
+        :param count: broj orijentira.
+        :param d_rows: pomeraji po redovima za moguce smerove kretanja.
+        :param d_cols: pomeraji po kolonama za moguce smerove kretanja.
+        :returns: list(tuple(int, int))
+        """
+        key = (count, tuple(d_rows), tuple(d_cols))
+        if key in self.landmarks:
+            return self.landmarks[key][0]
+
+        landmarks = []
+        fields = []
+        seed = self.find_position('r')
+        if seed[0] is None:
+            wall = self.elems.index('w')
+            free = [idx for idx, code in enumerate(self.get_cells()) if code != wall]
+            seed = divmod(free[0], self.cols) if len(free) > 0 else None
+        if seed is not None:
+            nearest = self.compute_distances(seed, d_rows, d_cols)  # rastojanje do najblizeg orijentira
+            for _ in range(count):
+                best_idx = max(range(len(nearest)), key=lambda idx: nearest[idx])
+                if nearest[best_idx] <= 0:  # nema vise dostiznih polja koja nisu orijentiri
+                    break
+                landmark = divmod(best_idx, self.cols)
+                landmarks.append(landmark)
+                distances = self.compute_distances(landmark, d_rows, d_cols)
+                fields.append(distances)
+                nearest = [min(a, b) if b >= 0 else a for a, b in zip(nearest, distances)]
+        self.landmarks[key] = (landmarks, fields)
+        return landmarks
+
+    def get_landmark_bound(self, position, target, count, d_rows, d_cols):
+        """
+        ALT donja granica rastojanja izmedju dva polja, preko nejednakosti trougla:
+        max po orijentirima L od |d(L, target) - d(L, position)|.
+        Pretpostavlja da su potezi simetricni, pa je d(L, x) = d(x, L).
+        :returns: float
+        """
+        bound = 0
+        position_idx = position[0] * self.cols + position[1]
+        target_idx = target[0] * self.cols + target[1]
+        self.get_landmarks(count, d_rows, d_cols)
+        for distances in self.landmarks[(count, tuple(d_rows), tuple(d_cols))][1]:
+            from_position, from_target = distances[position_idx], distances[target_idx]
+            if from_position < 0 and from_target < 0:  # orijentir je u drugoj komponenti
+                continue
+            if from_position < 0 or from_target < 0:  # polja su u razlicitim komponentama
+                return float('inf')
+            bound = max(bound, abs(from_target - from_position))
+        return bound
+
     def move_player_keyboard(self, direction):
         position = self.find_position('r')
         new_position = position
@@ -106,8 +691,12 @@ class Board:
             new_row = position[0] + d_row
             new_col = position[1] + d_col
             if 0 <= new_row < self.rows and 0 <= new_col < self.cols and self.data[new_row][new_col] != 'w':
-                self.data[position[0]][position[1]] = '.'
-                self.data[new_row][new_col] = 'r'
+                # robot moze da pregazi cilj ili portal, a to menja rastojanja
+                overwritten = self.data[new_row][new_col] != '.'
+                self.set_cell(position[0], position[1], '.')
+                self.set_cell(new_row, new_col, 'r')
+                if overwritten:
+                    self.invalidate(new_row, new_col)
                 new_position = new_row, new_col
         return position[0], position[1], new_position[0], new_position[1]
 
@@ -123,3 +712,267 @@ class Board:
             return 1, 0
         else:
             return 0, 0
+
+
+class GridRow(object):
+    """
+    Jedan red NumPy matrice kao lista karaktera (posrednik za NumpyBoard.data).
+    """
+
+    __slots__ = ('cells', 'elems')
+
+    def __init__(self, cells, elems):
+        self.cells = cells
+        self.elems = elems
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, col):
+        return self.elems[self.cells[col]]
+
+    def __setitem__(self, col, element):
+        if element not in self.elems:
+            raise ValueError('Element {0!r} se ne moze upisati u NumPy tablu'.format(element))
+        self.cells[col] = self.elems.index(element)
+
+    def __iter__(self):
+        return (self.elems[code] for code in self.cells.tolist())
+
+
+class GridData(object):
+    """
+    NumPy matrica kao lista redova (posrednik za NumpyBoard.data), data[row][col] je karakter elementa.
+    """
+
+    __slots__ = ('grid', 'elems')
+
+    def __init__(self, grid, elems):
+        self.grid = grid
+        self.elems = elems
+
+    def __len__(self):
+        return self.grid.shape[0]
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.grid.shape[0]:
+            raise IndexError(row)
+        return GridRow(self.grid[row], self.elems)
+
+    def __iter__(self):
+        return (GridRow(cells, self.elems) for cells in self.grid)
+
+
+class NumpyBoard(Board):
+    """
+    Tabla sa sadrzajem u NumPy matrici grid (uint8, kod celije je indeks elementa u elems),
+    jedan bajt po celiji umesto liste karaktera po redu (4000 x 4000 je 16 MB).
+    API je isti kao kod Board: data je posrednik koji cita i upisuje karaktere (sporiji po celiji),
+    a ucitavanje, snimanje, maska zidova, tabela suseda i trazenje elemenata rade nad celom matricom odjednom.
+    Kod kome je brzina bitna moze direktno koristiti grid i elems.
+    Tekst celija (koristi ga samo prikaz) pravi se tek kada zatreba.
+    Celije mogu sadrzati samo elemente iz elems (npr. ne i 'r,b' iz animacije u igri).
+    """
+
+    UNKNOWN_CODE = 255  # kod nepoznatog karaktera pri ucitavanju
+
+    def __init__(self, rows=20, cols=20):
+        if numpy is None:
+            raise ImportError('NumpyBoard zahteva NumPy (pip install numpy)')
+        super(NumpyBoard, self).__init__(rows, cols)
+
+    def allocate(self):
+        self.grid = numpy.zeros((self.rows, self.cols), dtype=numpy.uint8)
+        self._text = None
+
+    @property
+    def data(self):
+        return GridData(self.grid, self.elems)
+
+    @data.setter
+    def data(self, data):
+        self.grid = numpy.array([[self.elems.index(cell) for cell in cells] for cells in data], dtype=numpy.uint8)
+
+    @property
+    def text(self):
+        if self._text is None or len(self._text) != self.grid.shape[0]:
+            self._text = [[''] * self.grid.shape[1] for _ in range(self.grid.shape[0])]
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+
+    def element_codes(self):
+        """
+        Tabela prevodjenja bajta iz fajla u kod elementa (UNKNOWN_CODE za nepoznate karaktere).
+        """
+        codes = numpy.full(256, self.UNKNOWN_CODE, dtype=numpy.uint8)
+        for code, element in enumerate(self.elems):
+            codes[ord(element)] = code
+        return codes
+
+    def load_from_file(self, file_path):
+        """
+        Ucitavanje table iz fajla: redovi se nadovezuju u niz bajtova (jedan bajt po celiji),
+        pa se karakteri prevode u kodove nad celom matricom. Dimenzije table se uzimaju iz fajla.
+        :param file_path: putanja fajla.
+        :raises ValueError: ako redovi nisu iste duzine ili tabla sadrzi nepoznat element
+        """
+        cells = bytearray()
+        rows = cols = 0
+        for row in read_rows(file_path):
+            cells.extend(row.encode('ascii'))
+            rows, cols = rows + 1, len(row)
+        codes = self.element_codes()[numpy.frombuffer(cells, dtype=numpy.uint8)]
+        del cells  # niz karaktera vise nije potreban (manja najveca zauzetost memorije)
+        if (codes == self.UNKNOWN_CODE).any():
+            raise ValueError('Nepoznat element u tabli {0}'.format(file_path))
+        self.grid = codes.reshape(rows, cols)
+        self.rows, self.cols = self.grid.shape
+        self._text = None
+        self.index_positions()
+        self.invalidate()
+
+    def save_to_file(self, file_path):
+        """
+        Snimanje table u fajl.
+        :param file_path: putanja fajla.
+        """
+        if file_path:
+            chars = numpy.frombuffer(''.join(self.elems).encode('ascii'), dtype=numpy.uint8)
+            lines = numpy.empty((self.grid.shape[0], self.grid.shape[1] + 1), dtype=numpy.uint8)
+            lines[:, :-1] = chars[self.grid]
+            lines[:, -1] = ord('\n')
+            with open(file_path, 'wb') as f:
+                f.write(lines.tobytes())
+
+    def load_from_binary(self, file_path):
+        """
+        Ucitavanje binarne table mapiranjem fajla u memoriju (numpy.memmap), bez kopiranja celija.
+        Mapiranje je copy-on-write: izmene table ostaju u memoriji procesa i ne menjaju fajl.
+        Ako se tabela elemenata iz fajla razlikuje od elems, kodovi se prevode (uz kopiranje).
+        :param file_path: putanja fajla.
+        """
+        with open(file_path, 'rb') as board_f:
+            rows, cols, elements, offset = read_binary_header(board_f)
+        grid = numpy.memmap(file_path, dtype=numpy.uint8, mode='c', offset=offset, shape=(rows, cols))
+        if list(elements) != self.elems:
+            codes = numpy.full(256, -1, dtype=numpy.int16)
+            for code, element in enumerate(elements):
+                if element in self.elems:
+                    codes[code] = self.elems.index(element)
+            grid = codes[grid]
+            if (grid < 0).any():
+                raise ValueError('Nepoznat element u tabli {0}'.format(file_path))
+            grid = grid.astype(numpy.uint8)
+        elif grid.size > 0 and grid.max() >= len(self.elems):
+            raise ValueError('Nepoznat kod elementa u tabli {0}'.format(file_path))
+        self.grid = grid
+        self.rows, self.cols = rows, cols
+        self._text = None
+        self.index_positions()
+        self.invalidate()
+
+    def save_to_binary(self, file_path):
+        """
+        Snimanje table u binarni fajl (BINARY_HEADER).
+        :param file_path: putanja fajla.
+        """
+        cells = numpy.ascontiguousarray(self.grid).tobytes()  # pre otvaranja, grid moze biti mapiran iz istog fajla
+        with open(file_path, 'wb') as f:
+            write_binary_header(f, self.grid.shape[0], self.grid.shape[1], self.elems)
+            f.write(cells)
+
+    def clear(self):
+        """
+        Ciscenje sadrzaja cele table.
+        """
+        self.grid[:] = self.elems.index('.')
+        self._text = None
+        self.index_positions()
+        self.invalidate()
+
+    def index_positions(self):
+        self.cells = None
+        self.positions = dict((element, self.find_all(element)) for element in self.indexed_elems)
+
+    def get_cells(self):
+        if self.cells is None:
+            self.cells = bytearray(numpy.ascontiguousarray(self.grid).tobytes())
+        return self.cells
+
+    def compute_adjacency(self, d_rows, d_cols):
+        """
+        Tabela suseda (kao Board.compute_adjacency) nad celom matricom: za svaki smer kretanja
+        maska celija iz kojih je potez moguc, pa se redni brojevi suseda upisuju redom smerova
+        direktno u array (bez Python petlje po celijama).
+        """
+        rows, cols = self.grid.shape
+        free = self.grid != self.elems.index('w')
+        moves = []  # (smer, maska celija iz kojih je potez moguc)
+        counts = numpy.zeros((rows, cols), dtype=numpy.int64)
+        for d_row, d_col in zip(d_rows, d_cols):
+            mask = numpy.zeros((rows, cols), dtype=bool)
+            mask[max(0, -d_row):min(rows, rows - d_row), max(0, -d_col):min(cols, cols - d_col)] = \
+                free[max(0, d_row):min(rows, rows + d_row), max(0, d_col):min(cols, cols + d_col)]
+            mask &= free
+            counts += mask
+            moves.append((d_row * cols + d_col, mask.ravel()))
+
+        # portali: svi ostali portali koji nisu vec susedna polja
+        portals = [row * cols + col for row, col in self.find_elements('p')]
+        extras = {}
+        for idx in portals:
+            near = set(idx + step for step, mask in moves if mask[idx])
+            extras[idx] = [other for other in portals if other != idx and other not in near]
+            counts.flat[idx] += len(extras[idx])
+
+        offsets = array('i', [0]) * (rows * cols + 1)
+        offsets_view = numpy.frombuffer(offsets, dtype=numpy.dtype('i'))
+        numpy.cumsum(counts.ravel(), out=offsets_view[1:])
+        neighbours = array('i', [0]) * int(offsets_view[-1])
+        neighbours_view = numpy.frombuffer(neighbours, dtype=numpy.dtype('i'))
+        cursor = offsets_view[:-1].copy()  # sledece slobodno mesto u listi suseda svake celije
+        for step, mask in moves:
+            cells = numpy.flatnonzero(mask)
+            neighbours_view[cursor[cells]] = cells + step
+            cursor[cells] += 1
+        for idx in portals:
+            neighbours_view[cursor[idx]:cursor[idx] + len(extras[idx])] = extras[idx]
+        return offsets, neighbours
+
+    def find_all(self, element):
+        """
+        Sve pozicije elementa, red po red, pretragom cele matrice.
+        :returns: list(tuple(int, int))
+        """
+        if element not in self.elems:
+            return []
+        rows, cols = numpy.nonzero(self.grid == self.elems.index(element))
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def find_position(self, element):
+        positions = self.positions.get(element)
+        if positions is None:
+            positions = self.find_all(element)
+        return positions[0] if len(positions) > 0 else (None, None)
+
+    def find_elements(self, element):
+        positions = self.positions.get(element)
+        return list(positions) if positions is not None else self.find_all(element)
+
+    def get_wall_mask(self):
+        """
+        :returns: numpy.ndarray(bool) dimenzija rows x cols
+        """
+        return self.grid == self.elems.index('w')
+
+
+if __name__ == '__main__':
+    # python board.py tabla.brd [...] - prevodjenje tabli u binarni format
+    if len(sys.argv) < 2:
+        print('Upotreba: python board.py tabla.brd [tabla.brd ...]')
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        print(convert_to_binary(path))
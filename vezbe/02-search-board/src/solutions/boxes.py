@@ -0,0 +1,161 @@
+from __future__ import print_function
+
+from collections import deque
+
+from search import *
+from state import *
+
+
+class BoxOrderSearch(AStarSearch):
+    """
+    Skupljanje kutija kao problem redosleda obilaska, umesto pretrage prostora (pozicija x pokupljene kutije).
+    Najkraca rastojanja izmedju robota, kutija i cilja se uzimaju iz polja rastojanja table
+    (jedno polje po kutiji i za cilj, portali su vec ukljuceni u polja), pa se redosled kutija resava:
+    - Held-Karp dinamickim programiranjem, O(2^k * k^2), za najvise exact_limit kutija (optimalno)
+    - najblizim susedom i 2-opt popravkom za vise kutija (brzo, ali ne uvek optimalno).
+    Na kraju se deonice spajaju u putanju spustanjem niz polja rastojanja svake deonice.
+    Pretpostavlja da su potezi simetricni (ako moze a -> b, moze i b -> a).
+    Za stanja bez smerova kretanja (d_rows, d_cols) radi kao obican A*.
+    """
+
+    def __init__(self, board, exact_limit=12):
+        """
+        :param board: Board (tabla)
+        :param exact_limit: najveci broj kutija za koji se redosled racuna tacno (Held-Karp)
+        """
+        super(BoxOrderSearch, self).__init__(board)
+        self.exact_limit = exact_limit
+        self.order = None  # redosled kutija (pozicije) u poslednjoj pretrazi
+        self.cost = None  # duzina putanje (broj poteza) u poslednjoj pretrazi
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :return: path, processed_list, states_list (liste su prazne)
+        """
+        forward_state = initial_state(self.board)
+        if not hasattr(initial_state, 'd_rows') or forward_state.goal_position[0] is None:
+            return super(BoxOrderSearch, self).search(initial_state, deadline)
+        self.reset_counters()
+        self.order = self.cost = None
+        self.deadline = deadline
+
+        boxes = list(self.board.boxes)
+        points = [forward_state.position] + boxes + [forward_state.goal_position]
+        # polje rastojanja za svaku kutiju i za cilj; distances[i][j] - od tacke i do tacke j (j > 0)
+        fields = [None]
+        for point in points[1:]:
+            if self.timed_out():
+                return None, deque([]), deque([])
+            fields.append(self.board.get_distances(point, initial_state.d_rows, initial_state.d_cols))
+        self.processed_count = len(fields) - 1
+        distances = [[self.field_distance(fields[j], point) if j > 0 else None for j in range(len(points))]
+                     for point in points]
+
+        if len(boxes) <= self.exact_limit:
+            order = self.exact_order(distances, len(boxes))
+        else:
+            order = self.heuristic_order(distances, len(boxes))
+        if order is None:
+            return None, deque([]), deque([])
+
+        sequence = [0] + [box + 1 for box in order] + [len(points) - 1]
+        self.order = [boxes[box] for box in order]
+        self.cost = sum(distances[a][b] for a, b in zip(sequence, sequence[1:]))
+        path = [points[0]]
+        for point in sequence[1:]:
+            path.extend(self.leg(initial_state, path[-1], points[point], fields[point]))
+        return self.make_result(path, deque([]), deque([]))
+
+    def field_distance(self, field, position):
+        distance = field[position[0] * self.board.cols + position[1]]
+        return distance if distance >= 0 else INFINITY
+
+    def exact_order(self, distances, count):
+        """
+        Held-Karp: best[mask][j] je najkraci put od robota kroz kutije iz mask koji se zavrsava u kutiji j.
+        :return: optimalni redosled kutija (indeksi) ili None ako neka kutija ili cilj nisu dostizni
+                 ili je isteklo vreme
+        """
+        goal = count + 1
+        if count == 0:
+            return [] if distances[0][goal] < INFINITY else None
+        best = [[INFINITY] * count for _ in range(1 << count)]
+        previous = [[None] * count for _ in range(1 << count)]
+        for box in range(count):
+            best[1 << box][box] = distances[0][box + 1]
+        for mask in range(1, 1 << count):
+            if self.timed_out():
+                return None
+            for box in range(count):
+                cost = best[mask][box]
+                if cost == INFINITY:  # nedostizno ili kutija nije u mask
+                    continue
+                for next_box in range(count):
+                    if mask & (1 << next_box):
+                        continue
+                    next_mask = mask | (1 << next_box)
+                    next_cost = cost + distances[box + 1][next_box + 1]
+                    if next_cost < best[next_mask][next_box]:
+                        best[next_mask][next_box] = next_cost
+                        previous[next_mask][next_box] = box
+                self.generated_count += count
+
+        full = (1 << count) - 1
+        last = min(range(count), key=lambda box: best[full][box] + distances[box + 1][goal])
+        if best[full][last] + distances[last + 1][goal] == INFINITY:
+            return None
+        order = []
+        mask = full
+        while last is not None:
+            order.append(last)
+            mask, last = mask & ~(1 << last), previous[mask][last]
+        order.reverse()
+        return order
+
+    def heuristic_order(self, distances, count):
+        """
+        Najblizi sused, pa 2-opt: obrtanje dela redosleda dok god to skracuje putanju.
+        :return: redosled kutija (indeksi) ili None ako neka kutija ili cilj nisu dostizni
+                 ili je isteklo vreme
+        """
+        goal = count + 1
+        order = []
+        remaining = set(range(count))
+        point = 0
+        while len(remaining) > 0:
+            box = min(remaining, key=lambda other: (distances[point][other + 1], other))
+            if distances[point][box + 1] == INFINITY:
+                return None
+            order.append(box)
+            remaining.remove(box)
+            point = box + 1
+        if distances[point][goal] == INFINITY:
+            return None
+
+        sequence = [0] + [box + 1 for box in order] + [goal]
+        improved = True
+        while improved:
+            improved = False
+            if self.timed_out():
+                return None
+            for i in range(1, count):
+                for j in range(i + 1, count + 1):
+                    a, b, c, d = sequence[i - 1], sequence[i], sequence[j], sequence[j + 1]
+                    self.generated_count += 1
+                    if distances[a][c] + distances[b][d] < distances[a][b] + distances[c][d]:
+                        sequence[i:j + 1] = reversed(sequence[i:j + 1])
+                        improved = True
+        return [point - 1 for point in sequence[1:-1]]
+
+    def leg(self, initial_state, position, target, field):
+        """
+        Deonica putanje do target: iz svake pozicije se ide na legalnu poziciju sa najmanjim rastojanjem.
+        :return: pozicije deonice, bez pocetne
+        """
+        path = []
+        while position != target:
+            state = initial_state(self.board, None, position, target)
+            position = min(state.get_legal_positions(), key=lambda other: self.field_distance(field, other))
+            path.append(position)
+        return path
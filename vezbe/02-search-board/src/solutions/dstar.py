@@ -0,0 +1,195 @@
+from __future__ import print_function
+
+from collections import deque
+import heapq
+import itertools
+
+from search import *
+from state import *
+
+
+class DStarLiteSearch(BoardListener, AStarSearch):
+    """
+    D* Lite - inkrementalno planiranje putanje.
+    Pretraga ide unazad od cilja ka robotu i cuva vrednosti g/rhs izmedju poziva search.
+    Izmene table (switch_cell, pomeranje robota tastaturom) se preko board.listeners samo zapamte,
+    a sledeci poziv search popravlja samo deo resenja na koji su izmene uticale.
+    Promena cilja, portala ili nacina kretanja pokrece pretragu iz pocetka.
+    Za table sa kutijama radi kao obican A*.
+    """
+
+    def __init__(self, board):
+        super(DStarLiteSearch, self).__init__(board)
+        self.goal = None  # cilj za koji vazi sacuvano stanje pretrage (None - nema stanja)
+        self.moves = None
+        self.portals = None
+        self.changed_cells = set()  # izmenjene celije od poslednje pretrage
+        self.wall = board.elems.index('w')
+        self.listen()
+
+    def cell_changed(self, row, col):
+        if row is None:  # izmenjena je cela tabla
+            self.goal = None
+        else:
+            self.changed_cells.add((row, col))
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :param deadline: kao u Search.search; prekinuta pretraga ostavlja ispravno stanje, pa je sledeci poziv
+                         nastavlja.
+        :return: path, processed_list, states_list
+        """
+        forward_state = initial_state(self.board)
+        if not hasattr(initial_state, 'd_rows') or not self.is_bidirectional(forward_state):
+            return super(DStarLiteSearch, self).search(initial_state, deadline)
+        start, goal = forward_state.position, forward_state.goal_position
+        moves = list(zip(initial_state.d_rows, initial_state.d_cols))
+        portals = self.board.find_elements('p')
+
+        if self.goal != goal or self.moves != moves or self.portals != portals:
+            self.initialize(start, goal, moves, portals)
+        else:
+            # robot se pomerio: kljucevi u redu ostaju validni uz uvecanje km
+            self.km += self.heuristic(self.last_start, start)
+            self.last_start = start
+            self.start = start
+            for cell in self.changed_cells:
+                self.update_cell(cell)
+        self.changed_cells = set()
+
+        self.reset_counters()
+        self.deadline = deadline
+        if not self.compute_shortest_path():
+            return None, deque([]), deque([])
+        return self.extract_path(), deque([]), deque([])
+
+    # ---------- graf ----------
+
+    def walkable(self, position):
+        return self.board.get_cells()[position[0] * self.board.cols + position[1]] != self.wall
+
+    def neighbours(self, position):
+        """
+        Sve potencijalne susedne celije (bez obzira na zidove), ukljucujuci portale ako je celija portal.
+        Potezi su simetricni, pa su prethodnici isti kao sledbenici.
+        """
+        row, col = position
+        neighbours = [(row + d_row, col + d_col) for d_row, d_col in self.moves
+                      if 0 <= row + d_row < self.board.rows and 0 <= col + d_col < self.board.cols]
+        if position in self.portal_set:
+            neighbours.extend(portal for portal in self.portals if portal != position and portal not in neighbours)
+        return neighbours
+
+    def cost(self, position, other):
+        return 1 if self.walkable(position) and self.walkable(other) else INFINITY
+
+    def heuristic(self, position, other):
+        # konzistentna procena: direktno ili preko najblizeg portala; bez zidova, jer kljucevi u redu
+        # vaze samo dok se procena ne menja, a zidovi se menjaju izmedju pretraga.
+        # Potezi su simetricni, pa se procenjuje od other (celija koja se menja) do position (robot).
+        return self.board.get_grid_estimate(other, position, self.d_rows, self.d_cols, walls=False)
+
+    # ---------- D* Lite ----------
+
+    def initialize(self, start, goal, moves, portals):
+        self.start = self.last_start = start
+        self.goal = goal
+        self.moves = moves
+        self.d_rows, self.d_cols = [move[0] for move in moves], [move[1] for move in moves]
+        self.portals = portals
+        self.portal_set = set(portals)
+        self.km = 0
+        self.g = {}
+        self.rhs = {goal: 0}
+        self.heap = []
+        self.open = {}  # celija -> trenutni kljuc u redu (ostali elementi heap-a su zastareli)
+        self.counter = itertools.count()
+        self.push(goal, self.calculate_key(goal))
+
+    def calculate_key(self, position):
+        value = min(self.g.get(position, INFINITY), self.rhs.get(position, INFINITY))
+        return value + self.heuristic(self.start, position) + self.km, value
+
+    def push(self, position, key):
+        self.open[position] = key
+        heapq.heappush(self.heap, (key, next(self.counter), position))
+
+    def top(self):
+        while len(self.heap) > 0:
+            key, _, position = self.heap[0]
+            if self.open.get(position) == key:
+                return key, position
+            heapq.heappop(self.heap)  # zastareli element
+        return (INFINITY, INFINITY), None
+
+    def update_vertex(self, position):
+        if self.g.get(position, INFINITY) != self.rhs.get(position, INFINITY):
+            self.push(position, self.calculate_key(position))
+        else:
+            self.open.pop(position, None)
+
+    def update_rhs(self, position):
+        if position != self.goal:
+            self.rhs[position] = min([self.cost(position, other) + self.g.get(other, INFINITY)
+                                      for other in self.neighbours(position)] or [INFINITY])
+        self.update_vertex(position)
+
+    def update_cell(self, cell):
+        """
+        Izmenjena celija menja cene svih grana koje je dodiruju, pa se rhs racuna ponovo
+        za nju i njene susede.
+        """
+        for position in [cell] + self.neighbours(cell):
+            self.update_rhs(position)
+
+    def compute_shortest_path(self):
+        """
+        :return: False ako je pretraga prekinuta jer je isteklo vreme (deadline), inace True
+        """
+        while True:
+            key, position = self.top()
+            start_key = self.calculate_key(self.start)
+            start_rhs = self.rhs.get(self.start, INFINITY)
+            if position is None or (key >= start_key and start_rhs == self.g.get(self.start, INFINITY)):
+                return True
+            if self.timed_out():  # isteklo je vreme
+                return False
+            self.processed_count += 1
+            new_key = self.calculate_key(position)
+            g, rhs = self.g.get(position, INFINITY), self.rhs.get(position, INFINITY)
+            if key < new_key:
+                self.push(position, new_key)
+            elif g > rhs:
+                self.g[position] = rhs
+                del self.open[position]
+                for other in self.neighbours(position):
+                    if other != self.goal:
+                        self.rhs[other] = min(self.rhs.get(other, INFINITY), self.cost(other, position) + rhs)
+                    self.update_vertex(other)
+            else:
+                self.g[position] = INFINITY
+                for other in self.neighbours(position):
+                    if self.rhs.get(other, INFINITY) == self.cost(other, position) + g:
+                        self.update_rhs(other)
+                    else:
+                        self.update_vertex(other)
+                self.update_rhs(position)
+
+    def extract_path(self):
+        """
+        Putanja od robota do cilja: uvek se ide na suseda sa najmanjim cost + g.
+        Putanja duza od broja polja table znaci da g vrednosti nisu konzistentne, pa se tada vraca None.
+        """
+        if self.g.get(self.start, INFINITY) == INFINITY:
+            return None
+        path = [self.start]
+        position = self.start
+        while position != self.goal:
+            if len(path) > self.board.rows * self.board.cols:
+                return None
+            position = min(self.neighbours(position),
+                           key=lambda other: (self.cost(path[-1], other) + self.g.get(other, INFINITY),
+                                              self.heuristic(self.start, other)))
+            path.append(position)
+        return path
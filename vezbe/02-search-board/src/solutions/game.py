@@ -8,16 +8,23 @@ import sys
 import time
 from PIL import Image, ImageTk  # pip install --upgrade Pillow==3.1.1
 
-from board import Board
+from board import Board, BINARY_EXTENSION
 from search import *
 from state import *
+from dstar import DStarLiteSearch
+from boxes import BoxOrderSearch
 
 
 def load_board_from_file(filename=None):
     if filename is None:
         filename = tkFileDialog.askopenfilename(defaultextension='.brd',
-                                                filetypes=(('board files', '*.brd'), ('All files', '*.*')))
-    board.load_from_file(filename)
+                                                filetypes=(('board files', '*.brd'),
+                                                           ('binary board files', '*' + BINARY_EXTENSION),
+                                                           ('All files', '*.*')))
+    if filename.endswith(BINARY_EXTENSION):
+        board.load_from_binary(filename)
+    else:
+        board.load_from_file(filename)
     return filename
 
 
@@ -28,7 +35,13 @@ def save_board_to_file():
 
 
 def load_board(from_file=None):      # filename passed when reopening (resetting) same file
+    global rows, cols, grid_elem_ids, grid_text_ids
     load_board_from_file(from_file)
+    if (board.rows, board.cols) != (rows, cols):  # tabla iz fajla je drugih dimenzija
+        rows, cols = board.rows, board.cols
+        grid_elem_ids = [[[]] * cols for _ in range(rows)]
+        grid_text_ids = [[[]] * cols for _ in range(rows)]
+        canvas.config(width=cols * cell_size + 1, height=rows * cell_size + 1)
     display_board()
 
 
@@ -50,6 +63,8 @@ def key(event):
     if board.find_position('r') != (None, None):
         update_board(row, col)
         update_board(new_row, new_col)
+        if planner is not None:
+            replan()
 
 
 def switch_cell(event, row=None, col=None):
@@ -60,6 +75,8 @@ def switch_cell(event, row=None, col=None):
         row = cy // cell_size  # row
     board.switch_cell(row, col)
     update_board(row, col)
+    if planner is not None:
+        replan()
 
 
 def update_board(row, col):
@@ -165,6 +182,7 @@ def make_menu(win):
 
 processed = None
 path = None
+planner = None  # inkrementalni planer (D* Lite), cuva stanje pretrage izmedju izmena table
 
 
 # funkcija koja se poziva na dugme SEARCH
@@ -172,7 +190,7 @@ def do_search():
     global processed, path
     reset()
     # koju strategiju pretrage koristiti
-    search = IterativeDepthFirstSearch(board)
+    search = AStarSearch(board)
     # kog "agenta" koristiti
     initial_state = RobotState
     
@@ -186,8 +204,47 @@ def do_search():
 
     print('-'*15, 'DONE', '-'*15)
     print('Time: {0} ms'.format(end - start))
-    print('Processed nodes: {0}'.format(len(processed)))
+    print('Processed nodes: {0}'.format(search.processed_count))
     print('States left: {0}'.format(len(states)))
+    draw_path(path)
+
+
+# funkcija koja se poziva na dugme D* LITE, i posle svake izmene table dok je planer ukljucen
+def replan():
+    global planner, processed, path
+    if planner is None:
+        planner = DStarLiteSearch(board)
+    reset()
+    board.boxes = board.find_elements('b')
+
+    start = time.clock()
+    path, processed, states = planner.search(RobotState)
+    end = time.clock()
+
+    print('-'*15, 'REPLANNED', '-'*15)
+    print('Time: {0} ms'.format(end - start))
+    print('Processed nodes: {0}'.format(planner.processed_count))
+    draw_path(path)
+
+
+# funkcija koja se poziva na dugme BOXES: redosled kutija umesto pretrage prostora stanja
+def solve_boxes():
+    global processed, path
+    reset()
+    search = BoxOrderSearch(board)
+    board.boxes = board.find_elements('b')
+
+    start = time.clock()
+    path, processed, states = search.search(RobotState)
+    end = time.clock()
+
+    print('-'*15, 'BOXES', '-'*15)
+    print('Time: {0} ms'.format(end - start))
+    print('Box order: {0}'.format(search.order))
+    draw_path(path)
+
+
+def draw_path(path):
     if path is None:
         # nije bilo resenja
         print('-'*15, 'NO SOLUTION', '-'*15)
@@ -217,9 +274,9 @@ def move_icon(from_position, to_position, has_box=None):
     else:
         t += ',' + f
         f = '.'
-    board.data[from_position[0]][from_position[1]] = f
+    board.set_cell(from_position[0], from_position[1], f)
     update_board(from_position[0], from_position[1])
-    board.data[to_position[0]][to_position[1]] = t
+    board.set_cell(to_position[0], to_position[1], t)
     update_board(to_position[0], to_position[1])
     root.update()
 
@@ -234,69 +291,74 @@ def debug():
         time.sleep(0.2)
 
 #  main program #
-rows = 20  # broj redova table
-cols = 20  # broj kolona table
-cell_size = 40  # velicina celije
-
-board = Board(rows=rows, cols=cols)
-
-grid_elem_ids = [[[]] * cols for _ in range(rows)]
-grid_text_ids = [[[]] * cols for _ in range(rows)]
-
-# mapiranje sadrzaja table na boju celije
-board_to_colors = {'.': 'white',
-                   'w': 'gray',
-                   'g': 'orangered',
-                   'p': 'yellow',
-                   'b': 'blue'}
-# mapiranje sadrzaja table na ikonicu
-board_to_icons = {'r': 'robot.png'}
-
-
-root = tk.Tk()
-root.title('ORI - Pretrage')
-make_menu(root)  # make window menu
-ui = tk.Frame(root, bg='white')  # main UI
-ui2 = tk.Frame(root, bg='white')
-
-# define the user interaction widgets
-canvas = tk.Canvas(root, width=cols * cell_size + 1, height=rows * cell_size + 1,
-                   highlightthickness=0, bd=0, bg='white')
-
-# load icons
-canvas.icons = dict()
-icons = dict()
-for f in os.listdir('../robot/icons'):
-    icon = Image.open(os.path.join('../robot/icons', f))
-    icon = icon.resize((cell_size - 2, cell_size - 2), Image.ANTIALIAS)  # resize icon to fit cell
-    icon = ImageTk.PhotoImage(icon)
-    icons[f] = icon
-
-# create buttons
-start_button = tk.Button(ui, text='SEARCH', width=10, command=do_search)
-restart_button = tk.Button(ui, text='RESET', width=10, command=reset)
-clear_button = tk.Button(ui, text='CLEAR ALL', width=10, command=clear)
-debug_button = tk.Button(ui, text='DEBUG', width=10, command=debug)
-stat_report = tk.Label(root, text='      ', bg='white', justify=tk.LEFT, relief=tk.GROOVE,
-                       font=tkFont.Font(weight='bold'))
-
-# add buttons to UI
-start_button.grid(row=0, column=0, padx=10, pady=10)
-clear_button.grid(row=2, column=0, padx=10, pady=10)
-clear_button.grid(row=3, column=0, padx=10, pady=10)
-restart_button.grid(row=4, column=0, padx=10, pady=10)
-debug_button.grid(row=5, column=0, padx=10, pady=10)
-
-# put everything on the screen
-display_board()
-canvas.bind('<Button-1>', switch_cell)  # bind left mouse click event to function switch_cell
-root.bind('<Key>', key)  # bind keyboard event to function key
-ui.pack(side=tk.RIGHT, expand=tk.YES, fill=tk.BOTH)
-canvas.pack(side=tk.TOP, expand=tk.YES, fill=tk.BOTH)
-ui2.pack(side=tk.LEFT, expand=tk.YES, fill=tk.BOTH, anchor=tk.W)
-stat_report.pack(side=tk.RIGHT, expand=tk.NO, fill=tk.NONE)
-
-# load default board
-load_board('../robot/boards/board.brd')
-
-root.mainloop()
+if __name__ == '__main__':
+    rows = 20  # broj redova table
+    cols = 20  # broj kolona table
+    cell_size = 40  # velicina celije
+
+    board = Board(rows=rows, cols=cols)
+
+    grid_elem_ids = [[[]] * cols for _ in range(rows)]
+    grid_text_ids = [[[]] * cols for _ in range(rows)]
+
+    # mapiranje sadrzaja table na boju celije
+    board_to_colors = {'.': 'white',
+                       'w': 'gray',
+                       'g': 'orangered',
+                       'p': 'yellow',
+                       'b': 'blue'}
+    # mapiranje sadrzaja table na ikonicu
+    board_to_icons = {'r': 'robot.png'}
+
+
+    root = tk.Tk()
+    root.title('ORI - Pretrage')
+    make_menu(root)  # make window menu
+    ui = tk.Frame(root, bg='white')  # main UI
+    ui2 = tk.Frame(root, bg='white')
+
+    # define the user interaction widgets
+    canvas = tk.Canvas(root, width=cols * cell_size + 1, height=rows * cell_size + 1,
+                       highlightthickness=0, bd=0, bg='white')
+
+    # load icons
+    canvas.icons = dict()
+    icons = dict()
+    for f in os.listdir('../robot/icons'):
+        icon = Image.open(os.path.join('../robot/icons', f))
+        icon = icon.resize((cell_size - 2, cell_size - 2), Image.ANTIALIAS)  # resize icon to fit cell
+        icon = ImageTk.PhotoImage(icon)
+        icons[f] = icon
+
+    # create buttons
+    start_button = tk.Button(ui, text='SEARCH', width=10, command=do_search)
+    restart_button = tk.Button(ui, text='RESET', width=10, command=reset)
+    clear_button = tk.Button(ui, text='CLEAR ALL', width=10, command=clear)
+    debug_button = tk.Button(ui, text='DEBUG', width=10, command=debug)
+    replan_button = tk.Button(ui, text='D* LITE', width=10, command=replan)
+    boxes_button = tk.Button(ui, text='BOXES', width=10, command=solve_boxes)
+    stat_report = tk.Label(root, text='      ', bg='white', justify=tk.LEFT, relief=tk.GROOVE,
+                           font=tkFont.Font(weight='bold'))
+
+    # add buttons to UI
+    start_button.grid(row=0, column=0, padx=10, pady=10)
+    clear_button.grid(row=2, column=0, padx=10, pady=10)
+    clear_button.grid(row=3, column=0, padx=10, pady=10)
+    restart_button.grid(row=4, column=0, padx=10, pady=10)
+    debug_button.grid(row=5, column=0, padx=10, pady=10)
+    replan_button.grid(row=6, column=0, padx=10, pady=10)
+    boxes_button.grid(row=7, column=0, padx=10, pady=10)
+
+    # put everything on the screen
+    display_board()
+    canvas.bind('<Button-1>', switch_cell)  # bind left mouse click event to function switch_cell
+    root.bind('<Key>', key)  # bind keyboard event to function key
+    ui.pack(side=tk.RIGHT, expand=tk.YES, fill=tk.BOTH)
+    canvas.pack(side=tk.TOP, expand=tk.YES, fill=tk.BOTH)
+    ui2.pack(side=tk.LEFT, expand=tk.YES, fill=tk.BOTH, anchor=tk.W)
+    stat_report.pack(side=tk.RIGHT, expand=tk.NO, fill=tk.NONE)
+
+    # load default board
+    load_board('../robot/boards/board.brd')
+
+    root.mainloop()
@@ -0,0 +1,329 @@
+from __future__ import print_function
+
+from collections import deque
+
+from search import *
+from state import *
+
+
+class AbstractState(State):
+    """
+    Stanje pretrage apstraktnog grafa: pozicija je cvor grafa (celija ulaza u klaster ili portal),
+    a trenutna cena je zbir tezina grana od pocetnog cvora.
+    Umesto table, stanje dobija HierarchicalSearch ciji graf se pretrazuje.
+    """
+
+    __slots__ = ('cost',)
+
+    def __init__(self, board, parent=None, position=None, goal_position=None):
+        super(AbstractState, self).__init__(board, parent, position, goal_position)
+        self.cost = parent.cost + board.edge_cost(parent.position, position) if parent is not None else 0
+
+    def get_agent_code(self):
+        return 'r'
+
+    def get_agent_goal_code(self):
+        return 'g'
+
+    def get_legal_positions(self):
+        return list(self.board.get_neighbours(self.position).keys())
+
+    def is_final_state(self):
+        return self.position == self.goal_position
+
+    def unique_hash(self):
+        return self.position
+
+    def get_cost(self):
+        return self.board.estimate(self.position, self.goal_position)
+
+    def get_current_cost(self):
+        return self.cost
+
+
+def region_state(state_class, bounds):
+    """
+    Pravi podklasu stanja cije je kretanje ograniceno na pravougaonik table (klaster).
+    :param state_class: klasa stanja (RobotState ili podklasa)
+    :param bounds: (prvi red, prva kolona, red iza poslednjeg, kolona iza poslednje)
+    :return: klasa stanja
+    """
+    diagonal = len(state_class.d_rows) > 4
+
+    class RegionState(state_class):
+        __slots__ = ()
+
+        def get_legal_positions(self):
+            return [(row, col) for row, col in super(RegionState, self).get_legal_positions()
+                    if bounds[0] <= row < bounds[2] and bounds[1] <= col < bounds[3]]
+
+        def get_cost(self):
+            # rastojanje unutar klastera, bez polja rastojanja cele table
+            d_row = abs(self.position[0] - self.goal_position[0])
+            d_col = abs(self.position[1] - self.goal_position[1])
+            return max(d_row, d_col) if diagonal else d_row + d_col
+
+    return RegionState
+
+
+class HierarchicalSearch(BoardListener, AStarSearch):
+    """
+    Hijerarhijska pretraga (HPA*) za velike table.
+    Tabla se deli na klastere velicine cluster_size x cluster_size. Na granicama susednih klastera
+    se biraju ulazi, a unutar klastera se unapred racunaju rastojanja izmedju ulaza i portala.
+    Pretraga ide u dva nivoa: A* nad apstraktnim grafom (ulazi i portali), pa A* unutar
+    klastera kroz koje prolazi apstraktna putanja. Putanja je skoro optimalna.
+    Izmena celije (switch_cell) ponovo racuna samo klaster te celije i njegove susede.
+    Za table sa kutijama radi kao obican A*.
+    """
+
+    def __init__(self, board, cluster_size=10, entrance_width=6):
+        """
+        :param board: Board (tabla)
+        :param cluster_size: velicina stranice klastera
+        :param entrance_width: ulaz ove ili vece sirine dobija dva cvora (na krajevima), a uzi jedan (u sredini)
+        """
+        super(HierarchicalSearch, self).__init__(board)
+        self.cluster_size = cluster_size
+        self.entrance_width = entrance_width
+        self.d_rows = self.d_cols = None  # smerovi kretanja za koje je graf napravljen
+        self.entrances = {}  # (klaster, susedni klaster) -> lista parova susednih celija
+        self.inter = {}  # cvor -> set cvorova u susednim klasterima (cena 1)
+        self.intra = {}  # klaster -> {cvor: {cvor u istom klasteru: cena}}
+        self.portals = []
+        self.query_edges = {}  # privremene grane pocetka i cilja upita
+        self.dirty = set()  # klasteri koje treba ponovo izracunati
+        self.listen()
+
+    def cell_changed(self, row, col):
+        if row is None:  # izmenjena je cela tabla
+            self.d_rows = self.d_cols = None
+        elif self.d_rows is not None:
+            self.dirty.add(self.cluster_of((row, col)))
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :return: path, processed_list, states_list
+        """
+        forward_state = initial_state(self.board)
+        if not hasattr(initial_state, 'd_rows') or not self.is_bidirectional(forward_state):
+            return super(HierarchicalSearch, self).search(initial_state, deadline)
+        self.prepare(initial_state.d_rows, initial_state.d_cols)
+
+        start, goal = forward_state.position, forward_state.goal_position
+        self.query_edges = {}
+        self.connect(start, goal)
+        self.connect(goal, start)
+
+        abstract_search = AStarSearch(self)
+        abstract_search.keep_states = self.keep_states
+        path, processed_list, states_list = abstract_search.search(
+            lambda graph: AbstractState(graph, None, start, goal), deadline)
+        self.processed_count = abstract_search.processed_count
+        self.generated_count = abstract_search.generated_count
+        if path is not None:
+            path = self.refine(list(path), initial_state, deadline)
+        self.query_edges = {}
+        return self.make_result(path, processed_list, states_list)
+
+    # ---------- graf ----------
+
+    def cluster_of(self, position):
+        return position[0] // self.cluster_size, position[1] // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        return (cluster[0] * self.cluster_size, cluster[1] * self.cluster_size,
+                min((cluster[0] + 1) * self.cluster_size, self.board.rows),
+                min((cluster[1] + 1) * self.cluster_size, self.board.cols))
+
+    def cluster_neighbours(self, cluster):
+        """
+        Susedni klasteri; kod kretanja u 8 smerova i dijagonalni, jer se preko ugla moze preci.
+        """
+        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        if len(self.d_rows) > 4:
+            directions += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+        neighbours = []
+        for d_row, d_col in directions:
+            other = cluster[0] + d_row, cluster[1] + d_col
+            if 0 <= other[0] * self.cluster_size < self.board.rows and \
+                    0 <= other[1] * self.cluster_size < self.board.cols:
+                neighbours.append(other)
+        return neighbours
+
+    def walkable(self, row, col):
+        return self.board.get_cells()[row * self.board.cols + col] != self.board.elems.index('w')
+
+    def prepare(self, d_rows, d_cols):
+        """
+        Pravi apstraktni graf, ili ponovo racuna samo izmenjene klastere.
+        """
+        if self.d_rows != list(d_rows) or self.d_cols != list(d_cols):
+            self.d_rows, self.d_cols = list(d_rows), list(d_cols)
+            self.entrances, self.inter, self.intra = {}, {}, {}
+            self.dirty = set((row, col)
+                             for row in range((self.board.rows + self.cluster_size - 1) // self.cluster_size)
+                             for col in range((self.board.cols + self.cluster_size - 1) // self.cluster_size))
+        if len(self.dirty) == 0:
+            return
+
+        self.portals = self.board.find_elements('p')
+        affected = set(self.dirty)
+        for cluster in self.dirty:
+            for other in self.cluster_neighbours(cluster):
+                self.compute_border(min(cluster, other), max(cluster, other))
+                affected.add(other)
+        for cluster in affected:
+            self.compute_intra(cluster)
+        self.dirty = set()
+
+    def compute_border(self, cluster, other):
+        """
+        Ulazi izmedju klastera i suseda (desnog, donjeg ili dijagonalnog donjeg): za svaki niz
+        susednih slobodnih parova celija preko granice bira se jedan ili dva para.
+        Dijagonalni prelaz se dodaje posebno, samo ako se preko granice ne moze preci pravo pored njega.
+        """
+        bounds = self.cluster_bounds(cluster)
+        d_row, d_col = other[0] - cluster[0], other[1] - cluster[1]
+        walkable = self.walkable
+        pairs = []
+        diagonal_pairs = []
+        if (d_row, d_col) == (0, 1):  # desni sused
+            col = bounds[3] - 1
+            pairs = [((row, col), (row, col + 1)) for row in range(bounds[0], bounds[2])]
+            diagonal_pairs = [((row, col), (row + step, col + 1)) for row in range(bounds[0], bounds[2])
+                              for step in (-1, 1) if bounds[0] <= row + step < bounds[2]]
+        elif (d_row, d_col) == (1, 0):  # donji sused
+            row = bounds[2] - 1
+            pairs = [((row, col), (row + 1, col)) for col in range(bounds[1], bounds[3])]
+            diagonal_pairs = [((row, col), (row + 1, col + step)) for col in range(bounds[1], bounds[3])
+                              for step in (-1, 1) if bounds[1] <= col + step < bounds[3]]
+        elif d_col == 1:  # dijagonalno dole desno
+            diagonal_pairs = [((bounds[2] - 1, bounds[3] - 1), (bounds[2], bounds[3]))]
+        else:  # dijagonalno dole levo
+            diagonal_pairs = [((bounds[2] - 1, bounds[1]), (bounds[2], bounds[1] - 1))]
+        pairs = [(a, b) for a, b in pairs if walkable(a[0], a[1]) and walkable(b[0], b[1])]
+
+        entrances = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and len(run) > 0 and \
+                    abs(pair[0][0] - run[-1][0][0]) + abs(pair[0][1] - run[-1][0][1]) == 1:
+                run.append(pair)
+                continue
+            if len(run) >= self.entrance_width:
+                entrances.extend([run[0], run[-1]])
+            elif len(run) > 0:
+                entrances.append(run[len(run) // 2])
+            run = [pair]
+
+        if len(self.d_rows) > 4:
+            for a, b in diagonal_pairs:
+                if walkable(a[0], a[1]) and walkable(b[0], b[1]) and \
+                        not walkable(a[0], b[1]) and not walkable(b[0], a[1]):
+                    entrances.append((a, b))
+
+        for a, b in self.entrances.get((cluster, other), []):
+            self.inter[a].discard(b)
+            self.inter[b].discard(a)
+        self.entrances[(cluster, other)] = entrances
+        for a, b in entrances:
+            self.inter.setdefault(a, set()).add(b)
+            self.inter.setdefault(b, set()).add(a)
+
+    def cluster_nodes(self, cluster):
+        nodes = set(portal for portal in self.portals if self.cluster_of(portal) == cluster)
+        for other in self.cluster_neighbours(cluster):
+            for pair in self.entrances.get((min(cluster, other), max(cluster, other)), []):
+                nodes.update(node for node in pair if self.cluster_of(node) == cluster)
+        return nodes
+
+    def compute_intra(self, cluster):
+        nodes = self.cluster_nodes(cluster)
+        bounds = self.cluster_bounds(cluster)
+        intra = {}
+        for node in nodes:
+            distances = self.local_distances(node, bounds)
+            intra[node] = dict((other, distances[other]) for other in nodes
+                               if other != node and other in distances)
+        self.intra[cluster] = intra
+
+    def local_distances(self, source, bounds):
+        """
+        Pretraga u sirinu ogranicena na klaster (bez portala).
+        :return: dict celija -> rastojanje od source
+        """
+        distances = {source: 0}
+        queue = deque([source])
+        while len(queue) > 0:
+            row, col = queue.popleft()
+            for d_row, d_col in zip(self.d_rows, self.d_cols):
+                new_row, new_col = row + d_row, col + d_col
+                if bounds[0] <= new_row < bounds[2] and bounds[1] <= new_col < bounds[3] and \
+                        (new_row, new_col) not in distances and self.walkable(new_row, new_col):
+                    distances[(new_row, new_col)] = distances[(row, col)] + 1
+                    queue.append((new_row, new_col))
+        return distances
+
+    def connect(self, position, other):
+        """
+        Privremeno povezuje poziciju (pocetak ili cilj upita) sa cvorovima njenog klastera,
+        i direktno sa drugom pozicijom upita ako je u istom klasteru.
+        """
+        cluster = self.cluster_of(position)
+        distances = self.local_distances(position, self.cluster_bounds(cluster))
+        targets = self.cluster_nodes(cluster)
+        targets.add(other)
+        for node in targets:
+            if node != position and node in distances:
+                self.query_edges.setdefault(position, {})[node] = distances[node]
+                self.query_edges.setdefault(node, {})[position] = distances[node]
+
+    def get_neighbours(self, node):
+        """
+        :return: dict sused -> cena grane
+        """
+        neighbours = dict(self.intra.get(self.cluster_of(node), {}).get(node, {}))
+        for other in self.inter.get(node, ()):
+            neighbours[other] = 1
+        if node in self.portals:
+            for portal in self.portals:
+                if portal != node:
+                    neighbours[portal] = 1
+        for other, cost in self.query_edges.get(node, {}).items():
+            if cost < neighbours.get(other, cost + 1):
+                neighbours[other] = cost
+        return neighbours
+
+    def edge_cost(self, node, other):
+        return self.get_neighbours(node)[other]
+
+    def estimate(self, position, goal):
+        return self.board.get_grid_estimate(position, goal, self.d_rows, self.d_cols)
+
+    # ---------- preciscavanje putanje ----------
+
+    def refine(self, abstract_path, initial_state, deadline=None):
+        """
+        Pretvara apstraktnu putanju u putanju po celijama: susedne celije i teleportovanja
+        se samo dodaju, a za grane unutar klastera se pokrece A* ogranicen na taj klaster.
+        :return: putanja ili None ako je isteklo vreme (deadline)
+        """
+        moves = set(zip(self.d_rows, self.d_cols))
+        path = [abstract_path[0]]
+        for node, next_node in zip(abstract_path, abstract_path[1:]):
+            if (next_node[0] - node[0], next_node[1] - node[1]) in moves:
+                path.append(next_node)
+                continue
+            if node in self.portals and next_node in self.portals and self.edge_cost(node, next_node) == 1:
+                path.append(next_node)  # teleportovanje
+                continue
+            bounds = self.cluster_bounds(self.cluster_of(node))
+            state_class = region_state(initial_state, bounds)
+            leg, _, _ = AStarSearch(self.board).search(
+                lambda board: state_class(board, None, node, next_node), deadline)
+            if leg is None:
+                return None
+            path.extend(list(leg)[1:])
+        return path
@@ -0,0 +1,281 @@
+from __future__ import print_function
+
+from collections import deque
+import heapq
+import itertools
+import multiprocessing
+import numbers
+import time
+import traceback
+import zlib
+
+try:
+    from Queue import Empty  # Python 2
+except ImportError:
+    from queue import Empty  # Python 3
+
+from search import *
+from state import *
+
+
+def owner(key, workers):
+    """
+    Proces koji je vlasnik stanja sa datim unique_hash.
+    Ne koristi se ugradjeni hash jer se za stringove razlikuje od procesa do procesa.
+    :param key: unique_hash stanja (int ili str)
+    :param workers: broj procesa
+    :return: int
+    """
+    if isinstance(key, numbers.Integral):
+        return ((key * 2654435761) & 0xffffffff) % workers  # mesanje bitova (Fibonacci hash)
+    return (zlib.crc32(str(key).encode('utf-8')) & 0xffffffff) % workers
+
+
+def detach(state):
+    """
+    Stanje bez roditelja i table, da bi se moglo poslati drugom procesu
+    (roditelj se pamti preko unique_hash, a tablu svaki proces vec ima).
+    """
+    state.parent = None
+    state.board = None
+    return state
+
+
+def hda_worker(idx, board, inboxes, requests, results, sent, received, idle, incumbent, done, batch_size):
+    """
+    Jedan proces HDA* pretrage. Kada se postavi done, salje u results
+    ('summary', idx, broj procesiranih, broj generisanih, cena najboljeg cilja, unique_hash najboljeg cilja),
+    a zatim odgovara na upite koordinatora o putanji: za unique_hash iz requests[idx] salje
+    ('chain', idx, pozicije do prvog pretka drugog vlasnika, unique_hash tog pretka ili None).
+    Upiti se zavrsavaju sa None. Izuzetak se salje kao ('error', idx, opis greske).
+    """
+    try:
+        processed_count, generated_count, goal_cost, goal_key, parents = hda_expand(
+            idx, board, inboxes, sent, received, idle, incumbent, done, batch_size)
+        results.put(('summary', idx, processed_count, generated_count, goal_cost, goal_key))
+        workers = len(inboxes)
+        key = requests[idx].get()
+        while key is not None:
+            chain = []
+            while key is not None and owner(key, workers) == idx:
+                key, position = parents[key]
+                chain.append(position)
+            results.put(('chain', idx, chain, key))
+            key = requests[idx].get()
+    except Exception:
+        results.put(('error', idx, traceback.format_exc()))
+
+
+def hda_expand(idx, board, inboxes, sent, received, idle, incumbent, done, batch_size):
+    """
+    Obrada stanja jednog procesa HDA* pretrage dok se ne postavi done. Obradjuju se samo stanja
+    ciji je proces vlasnik, a sledbenici drugih vlasnika se salju u njihove redove
+    u paketima od najvise batch_size stanja.
+    :return: (broj procesiranih, broj generisanih, cena najboljeg cilja, unique_hash najboljeg cilja,
+              roditelji: unique_hash -> (unique_hash roditelja, pozicija))
+    """
+    workers = len(inboxes)
+    inbox = inboxes[idx]
+    for queue in inboxes:
+        queue.cancel_join_thread()  # neprocitani paketi posle zavrsetka se odbacuju
+
+    open_list = []  # heap elemenata (f, h, g, redni broj, unique_hash)
+    counter = itertools.count()
+    g = {}  # unique_hash -> najbolja poznata cena
+    states = {}  # unique_hash -> stanje koje ceka na obradu
+    parents = {}  # unique_hash -> (unique_hash roditelja, pozicija)
+    outboxes = [[] for _ in range(workers)]
+    processed_count = generated_count = 0
+    goal_cost, goal_key = INFINITY, None
+
+    def insert(state, parent_key):
+        key = state.unique_hash()
+        cost = state.get_current_cost()
+        if cost >= g.get(key, INFINITY):
+            return
+        estimate = state.get_cost()
+        if estimate == INFINITY:
+            return
+        g[key] = cost
+        states[key] = state
+        parents[key] = (parent_key, state.position)
+        heapq.heappush(open_list, (cost + estimate, estimate, cost, next(counter), key))
+
+    def send(target):
+        with sent.get_lock():
+            sent.value += 1  # brojac se uvecava pre slanja, da poruka u letu ne bi bila nevidljiva
+        inboxes[target].put(outboxes[target])
+        outboxes[target] = []
+
+    def flush():
+        for target in range(workers):
+            if len(outboxes[target]) > 0:
+                send(target)
+
+    while not done.is_set():
+        # prijem stanja od drugih procesa
+        try:
+            messages = inbox.get_nowait() if len(open_list) > 0 else inbox.get(timeout=0.01)
+        except Empty:
+            messages = None
+        if messages is not None:
+            idle[idx] = 0  # pre uvecanja received, da koordinator ne bi video lazno mirovanje
+            for state, parent_key in messages:
+                state.board = board
+                insert(state, parent_key)
+            with received.get_lock():
+                received.value += 1
+            continue
+
+        # zastareli elementi i elementi koji ne mogu popraviti nadjeno resenje
+        while len(open_list) > 0 and open_list[0][2] != g[open_list[0][4]]:
+            heapq.heappop(open_list)
+        if len(open_list) == 0 or open_list[0][0] >= incumbent.value:
+            flush()
+            idle[idx] = 1
+            continue
+
+        idle[idx] = 0
+        _, _, cost, _, key = heapq.heappop(open_list)
+        curr_state = states.pop(key)
+        processed_count += 1
+
+        if curr_state.is_final_state():
+            if cost < goal_cost:
+                goal_cost, goal_key = cost, key
+            with incumbent.get_lock():
+                if cost < incumbent.value:
+                    incumbent.value = cost
+            continue
+
+        new_states = curr_state.get_next_states()
+        generated_count += len(new_states)
+        for new_state in new_states:
+            new_state.parent = None
+            target = owner(new_state.unique_hash(), workers)
+            if target == idx:
+                insert(new_state, key)
+            else:
+                outboxes[target].append((detach(new_state), key))
+                if len(outboxes[target]) >= batch_size:
+                    send(target)
+        if processed_count % batch_size == 0:
+            flush()  # ostali procesi ne treba dugo da cekaju na manje pakete
+
+    return processed_count, generated_count, goal_cost, goal_key, parents
+
+
+class HashDistributedAStarSearch(Search):
+    """
+    Paralelni A* (HDA*): stanja se dele procesima po unique_hash, svaki proces ima svoj
+    prioritetni red i sam obradjuje stanja ciji je vlasnik, a sledbenike salje vlasnicima kroz redove.
+    Najbolje nadjeno resenje je zajednicko, pa procesi ne obradjuju stanja koja ga ne mogu popraviti.
+    Pretraga se zavrsava kada svi procesi miruju i kada su sve poslate poruke primljene
+    (dve uzastopne jednake provere brojaca).
+    Ubrzanje raste sa brojem procesa samo kada je obrada stanja skupa u odnosu na slanje
+    (velik broj kutija); za male table je obican AStarSearch brzi.
+    Putanja se sastavlja upitima vlasnicima stanja na njoj, pa se tabele roditelja ne salju.
+    Ako neki proces padne ili bude ubijen, pretraga se prekida sa RuntimeError.
+    """
+
+    poll_timeout = 0.1  # koliko se najduze ceka na poruku pre provere da li su procesi zivi
+
+    def __init__(self, board, workers=None, batch_size=64):
+        """
+        :param board: Board (tabla)
+        :param workers: broj procesa; None - broj procesora
+        :param batch_size: najveci broj stanja u jednoj poruci
+        """
+        super(HashDistributedAStarSearch, self).__init__(board)
+        self.workers = workers if workers is not None else multiprocessing.cpu_count()
+        self.batch_size = batch_size
+        self.generated_count = 0
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :param deadline: trenutak (time.time()) posle kog se pretraga prekida; vraca se najbolje
+                         do tada nadjeno resenje (ne mora biti optimalno) ili None
+        :return: path, processed_list, states_list (liste su prazne, stanja ostaju u procesima)
+        """
+        initial_state = initial_state(self.board)
+        inboxes = [multiprocessing.Queue() for _ in range(self.workers)]
+        requests = [multiprocessing.Queue() for _ in range(self.workers)]
+        results = multiprocessing.Queue()
+        sent, received = multiprocessing.Value('l', 0), multiprocessing.Value('l', 0)
+        idle = multiprocessing.Array('b', [0] * self.workers)
+        incumbent = multiprocessing.Value('d', INFINITY)
+        done = multiprocessing.Event()
+        processes = [multiprocessing.Process(target=hda_worker,
+                                             args=(idx, self.board, inboxes, requests, results, sent, received,
+                                                   idle, incumbent, done, self.batch_size))
+                     for idx in range(self.workers)]
+        try:
+            for process in processes:
+                process.daemon = True
+                process.start()
+
+            # pocetno stanje dobija njegov vlasnik
+            with sent.get_lock():
+                sent.value += 1
+            inboxes[owner(initial_state.unique_hash(), self.workers)].put([(detach(initial_state), None)])
+
+            # koordinator: globalni uslov zavrsetka (ili proces koji se zavrsio pre vremena)
+            previous = None
+            while (deadline is None or time.time() < deadline) and all(p.is_alive() for p in processes):
+                counts = (sent.value, received.value)
+                if counts[0] == counts[1] and all(idle):
+                    if previous == counts:
+                        break
+                    previous = counts  # druga provera posle pauze potvrdjuje da se nista nije promenilo
+                else:
+                    previous = None
+                time.sleep(0.005)
+            done.set()
+
+            summaries = [self.receive(results, processes) for _ in processes]
+            self.processed_count = sum(summary[2] for summary in summaries)
+            self.generated_count = sum(summary[3] for summary in summaries)
+            if incumbent.value == INFINITY:
+                return None, deque([]), deque([])
+            _, goal_key = min((summary[4], summary[5]) for summary in summaries
+                                 if summary[5] is not None)
+
+            # putanja od cilja unazad, deo po deo od vlasnika stanja na njoj
+            path = []
+            key = goal_key
+            while key is not None:
+                requests[owner(key, self.workers)].put(key)
+                _, _, chain, key = self.receive(results, processes)
+                path.extend(chain)
+            path.reverse()
+            return path, deque([]), deque([])
+        finally:
+            done.set()
+            for queue in requests:
+                queue.put(None)
+            for process in processes:
+                process.join(self.poll_timeout)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+
+    def receive(self, results, processes):
+        """
+        Sledeca poruka procesa iz reda results. Red se ne ceka beskonacno: posle svakog poll_timeout
+        proverava se da li su svi procesi zivi.
+        :param results: multiprocessing.Queue za poruke procesa
+        :param processes: lista procesa pretrage
+        :return: poruka procesa (tuple)
+        """
+        while True:
+            try:
+                message = results.get(timeout=self.poll_timeout)
+            except Empty:
+                dead = [process for process in processes if not process.is_alive()]
+                if len(dead) > 0 and results.empty():
+                    raise RuntimeError('HDA* proces je prekinut (exitcode {0})'.format(dead[0].exitcode))
+                continue
+            if message[0] == 'error':
+                raise RuntimeError('HDA* proces {0}: {1}'.format(message[1], message[2]))
+            return message
@@ -0,0 +1,108 @@
+from __future__ import print_function
+
+from collections import deque
+import multiprocessing
+import time
+
+try:
+    from Queue import Empty  # Python 2
+except ImportError:
+    from queue import Empty  # Python 3
+
+from search import *
+from state import *
+
+
+def run_strategy(results, idx, strategy, board, initial_state):
+    """
+    Pokrece jednu strategiju u zasebnom procesu i salje rezultat u red results.
+    :param results: multiprocessing.Queue za rezultate
+    :param idx: redni broj strategije
+    :param strategy: klasa pretrage ili (klasa pretrage, dict parametara konstruktora)
+    :param board: Board (tabla)
+    :param initial_state: klasa inicijalnog stanja
+    """
+    start = time.time()
+    try:
+        search_class, kwargs = strategy if isinstance(strategy, tuple) else (strategy, {})
+        search = search_class(board, **kwargs)
+        path, _, _ = search.search(initial_state)
+        path = list(path) if path is not None else None
+        results.put((idx, path, search.processed_count, time.time() - start, None))
+    except Exception as e:
+        results.put((idx, None, 0, time.time() - start, repr(e)))
+
+
+class PortfolioSearch(Search):
+    """
+    Portfolio pretraga: vise strategija se pokrece paralelno, svaka u svom procesu, nad istom tablom.
+    Vraca se prvo prihvatljivo resenje, a ostali procesi se prekidaju.
+    Koja strategija je najbrza zavisi od rasporeda table, pa trka smanjuje najgora vremena
+    bez rucnog biranja strategije za svaku tablu.
+    """
+
+    default_strategies = [BreadthFirstSearch, AStarSearch, GreedySearch,
+                          BidirectionalBreadthFirstSearch, BidirectionalAStarSearch]
+    poll_timeout = 0.1  # koliko se najduze ceka na rezultat pre provere da li su procesi zivi
+
+    def __init__(self, board, strategies=None, accept=None):
+        """
+        :param board: Board (tabla)
+        :param strategies: lista klasa pretrage ili parova (klasa pretrage, dict parametara konstruktora)
+        :param accept: funkcija koja za putanju (listu pozicija) vraca da li je prihvatljiva;
+                       podrazumevano je prihvatljiva svaka nadjena putanja
+        """
+        super(PortfolioSearch, self).__init__(board)
+        self.strategies = strategies if strategies is not None else self.default_strategies
+        self.accept = accept if accept is not None else (lambda path: True)
+        self.winner = None  # strategija koja je dala prihvaceno resenje
+        self.results = []  # (strategija, duzina putanje ili None, broj procesiranih stanja, vreme, greska)
+        # za ubijen proces vreme je None, a greska 'exitcode N'
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :param deadline: trenutak (time.time()) posle kog se svi procesi prekidaju; None - bez ogranicenja
+        :return: path, processed_list, states_list (liste su prazne, stanja ostaju u procesima)
+        """
+        self.winner = None
+        self.results = []
+        self.processed_count = 0
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=run_strategy,
+                                             args=(results, idx, strategy, self.board, initial_state))
+                     for idx, strategy in enumerate(self.strategies)]
+        best_path = None
+        pending = set(range(len(processes)))  # strategije bez rezultata
+        try:
+            for process in processes:
+                process.daemon = True
+                process.start()
+            while len(pending) > 0 and (deadline is None or time.time() < deadline):
+                timeout = self.poll_timeout if deadline is None else \
+                    max(0, min(self.poll_timeout, deadline - time.time()))
+                try:
+                    idx, path, processed_count, elapsed, error = results.get(timeout=timeout)
+                except Empty:
+                    # proces koji se zavrsio bez rezultata (npr. ubijen) racuna se kao neuspesan
+                    for idx in sorted(pending):
+                        if not processes[idx].is_alive() and results.empty():
+                            pending.discard(idx)
+                            self.results.append((self.strategies[idx], None, 0, None,
+                                                 'exitcode {0}'.format(processes[idx].exitcode)))
+                    continue
+                pending.discard(idx)
+                strategy = self.strategies[idx]
+                self.results.append((strategy, len(path) if path is not None else None,
+                                     processed_count, elapsed, error))
+                if path is not None and self.accept(path):
+                    self.winner = strategy
+                    self.processed_count = processed_count
+                    best_path = path
+                    break
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        return best_path, deque([]), deque([])
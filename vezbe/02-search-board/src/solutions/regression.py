@@ -0,0 +1,266 @@
+"""
+Regresiona provera pretraga: na slucajnim malim tablama sa zidovima, portalima i kutijama
+duzine putanja pretraga se porede sa BreadthFirstSearch (najkraca putanja).
+Svaka putanja se proverava i potez po potez (tabela suseda table); pretrage koje ne garantuju
+najkracu putanju (npr. Greedy) smeju biti duze, pa se za njih samo ispisuje visak poteza,
+a nepotpune pretrage (beam) smeju i da ne nadju putanju.
+Iste table se proveravaju i u drugim oblicima (NumpyBoard, binarni fajl, citanje tekstualnog fajla u delovima),
+koji moraju dati isti sadrzaj, tabele suseda i najkrace putanje kao Board.
+
+Primer: python regression.py 50 7   (broj tabli, seed)
+"""
+from __future__ import print_function
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from board import Board, NumpyBoard, numpy, convert_to_binary, read_rows, BINARY_EXTENSION
+from search import *
+from state import *
+from hpa import HierarchicalSearch
+from dstar import DStarLiteSearch
+from boxes import BoxOrderSearch
+from portfolio import PortfolioSearch
+from parallel import HashDistributedAStarSearch
+
+# (ime, pravljenje pretrage za tablu, da li pretraga mora naci najkracu putanju (True), bilo koju putanju (False)
+#  ili sme i da ne nadje postojecu putanju (None), najveci broj polja table na kojoj se pretraga pokrece
+#  ili None - bez ogranicenja)
+STRATEGIES = [('AStarSearch', AStarSearch, True, None),
+              ('GreedySearch', GreedySearch, False, None),
+              ('IterativeDepthFirstSearch', IterativeDepthFirstSearch, True, 64),
+              ('IDAStarSearch', IDAStarSearch, True, 100),
+              ('IDAStarSearch (table)', lambda board: IDAStarSearch(board, table_size=256), True, 100),
+              ('BidirectionalBreadthFirstSearch', BidirectionalBreadthFirstSearch, True, None),
+              ('BidirectionalAStarSearch', BidirectionalAStarSearch, True, None),
+              ('JumpPointSearch', JumpPointSearch, True, None),
+              ('HierarchicalSearch', lambda board: HierarchicalSearch(board, cluster_size=4), False, None),
+              ('DStarLiteSearch', DStarLiteSearch, True, None),
+              ('AnytimeAStarSearch', AnytimeAStarSearch, True, None),
+              ('BeamSearch', BeamSearch, None, None),
+              ('BeamSearch (width 4)', lambda board: BeamSearch(board, width=4), None, None),
+              ('PortfolioSearch', PortfolioSearch, False, None),
+              ('HashDistributedAStarSearch', lambda board: HashDistributedAStarSearch(board, workers=2), True, None),
+              ('BoxOrderSearch', BoxOrderSearch, True, None)]
+TIME_LIMIT = 2  # sekundi po pretrazi; pretraga koja ne stigne se broji medju prekinutim, a ne medju greskama
+
+
+def make_random_board(rng, max_size=16, max_boxes=4):
+    """
+    Slucajna tabla: do 30% zidova, 0-3 portala, 0-max_boxes kutija, robot i cilj.
+    :param rng: random.Random
+    :returns: Board
+    """
+    board = Board(rows=rng.randint(3, max_size), cols=rng.randint(3, max_size))
+    walls = rng.choice([0, 0.1, 0.2, 0.3])
+    for row in range(board.rows):
+        for col in range(board.cols):
+            if rng.random() < walls:
+                board.set_cell(row, col, 'w')
+    free = [(row, col) for row in range(board.rows) for col in range(board.cols) if board.data[row][col] == '.']
+    cells = rng.sample(free, min(len(free), 2 + rng.randint(0, 3) + rng.randint(0, max_boxes)))
+    for element, (row, col) in zip(['r', 'g'], cells):
+        board.set_cell(row, col, element)
+    portals = rng.randint(0, 3)
+    for row, col in cells[2:2 + portals]:
+        board.set_cell(row, col, 'p')
+    for row, col in cells[2 + portals:]:
+        board.set_cell(row, col, 'b')
+    board.invalidate()
+    board.boxes = board.find_elements('b')
+    return board
+
+
+def check_path(board, path, state_class):
+    """
+    Greska u putanji (ili None): putanja mora poceti od robota, zavrsiti se na cilju, proci kroz sve kutije
+    i sastojati se samo od legalnih poteza (susedi iz tabele suseda, ukljucujuci teleportovanje).
+    """
+    if path[0] != board.find_position('r') or path[-1] != board.find_position('g'):
+        return 'pocetak ili kraj nisu robot i cilj'
+    missing = [box for box in board.boxes if box not in path]
+    if len(missing) > 0:
+        return 'nisu pokupljene kutije {0}'.format(missing)
+    offsets, neighbours = board.get_adjacency(state_class.d_rows, state_class.d_cols)
+    for position, next_position in zip(path, path[1:]):
+        idx = position[0] * board.cols + position[1]
+        if next_position[0] * board.cols + next_position[1] not in neighbours[offsets[idx]:offsets[idx + 1]]:
+            return 'nelegalan potez {0} -> {1}'.format(position, next_position)
+    return None
+
+
+def compare_boards(board, other):
+    """
+    Greska (ili None) ako se druga tabla razlikuje od board: sadrzaj, kodovi celija, indeks polozaja,
+    tabele suseda i duzine najkracih putanja za oba nacina kretanja moraju biti isti.
+    """
+    if (other.rows, other.cols) != (board.rows, board.cols):
+        return 'dimenzije {0}x{1} umesto {2}x{3}'.format(other.rows, other.cols, board.rows, board.cols)
+    if [list(cells) for cells in other.data] != board.data:
+        return 'razlicit sadrzaj'
+    if other.get_cells() != board.get_cells():
+        return 'razliciti kodovi celija'
+    for element in board.indexed_elems:
+        if other.find_elements(element) != board.find_elements(element):
+            return 'razliciti polozaji elementa {0}'.format(element)
+    other.boxes = board.boxes
+    for state_class in [RobotState, OrthogonalRobotState]:
+        if other.get_adjacency(state_class.d_rows, state_class.d_cols) != \
+                board.get_adjacency(state_class.d_rows, state_class.d_cols):
+            return 'razlicite tabele suseda ({0})'.format(state_class.__name__)
+        expected = BreadthFirstSearch(board).search(state_class)[0]
+        path = BreadthFirstSearch(other).search(state_class)[0]
+        expected = len(list(expected)) if expected is not None else None
+        path = len(list(path)) if path is not None else None
+        if path != expected:
+            return 'putanja duzine {0} umesto {1} ({2})'.format(path, expected, state_class.__name__)
+    return None
+
+
+def check_numpy_board(board, directory):
+    """
+    NumpyBoard ucitan iz tekstualnog fajla table mora biti isti kao Board.
+    """
+    file_path = os.path.join(directory, 'board.brd')
+    board.save_to_file(file_path)
+    numpy_board = NumpyBoard()
+    numpy_board.load_from_file(file_path)
+    return compare_boards(board, numpy_board)
+
+
+def check_binary_board(board, directory):
+    """
+    Tabla snimljena u binarnom formatu (i prevedena iz tekstualnog fajla) i ponovo ucitana, kao Board
+    i kao NumpyBoard (mapiranjem fajla), mora biti ista kao pocetna tabla.
+    """
+    file_path = os.path.join(directory, 'board' + BINARY_EXTENSION)
+    board.save_to_binary(file_path)
+    text_path = os.path.join(directory, 'text.brd')
+    board.save_to_file(text_path)
+    for loaded_path in [file_path, convert_to_binary(text_path)]:
+        for board_class in [Board, NumpyBoard] if numpy is not None else [Board]:
+            loaded = board_class()
+            loaded.load_from_binary(loaded_path)
+            error = compare_boards(board, loaded)
+            if error is not None:
+                return '{0} iz {1}: {2}'.format(board_class.__name__, os.path.basename(loaded_path), error)
+    return None
+
+
+def check_read_rows(board, directory):
+    """
+    read_rows mora dati iste redove za svaku velicinu dela fajla, sa i bez znaka za novi red na kraju
+    i sa sadrzajem iza praznog reda, a za redove razlicite duzine ValueError (bez izmene ucitane table).
+    """
+    rows = [''.join(cells) for cells in board.data]
+    file_path = os.path.join(directory, 'rows.brd')
+    for text in ['\n'.join(rows) + '\n', '\n'.join(rows), '\n'.join(rows) + '\n\nw.w\n']:
+        with open(file_path, 'w') as board_f:
+            board_f.write(text)
+        for chunk_size in [1, board.cols, board.cols + 1, 1 << 16]:
+            if list(read_rows(file_path, chunk_size)) != rows:
+                return 'razliciti redovi (delovi od {0} karaktera)'.format(chunk_size)
+    loaded = Board()
+    loaded.load_from_file(file_path)
+    error = compare_boards(board, loaded)
+    if error is not None:
+        return 'load_from_file: {0}'.format(error)
+
+    with open(file_path, 'w') as board_f:
+        board_f.write('\n'.join(rows + [rows[-1][:-1]]) + '\n')
+    try:
+        loaded.load_from_file(file_path)
+    except ValueError:
+        return compare_boards(board, loaded)
+    return 'redovi razlicite duzine nisu prijavljeni'
+
+
+# (ime, provera (tabla, direktorijum za privremene fajlove) koja vraca gresku ili None)
+BOARD_CHECKS = ([('NumpyBoard', check_numpy_board)] if numpy is not None else []) + \
+               [('binary board', check_binary_board),
+                ('read_rows', check_read_rows)]
+
+
+def run_strategies(board, board_idx, totals):
+    """
+    Pokrece sve pretrage (STRATEGIES) na tabli za oba nacina kretanja i dodaje rezultate u totals.
+    """
+    for state_class in [RobotState, OrthogonalRobotState]:
+        expected, _, _ = BreadthFirstSearch(board).search(state_class)
+        expected = list(expected) if expected is not None else None
+        for name, factory, exact, max_cells in STRATEGIES:
+            if max_cells is not None and board.rows * board.cols > max_cells:
+                continue
+            search = factory(board)
+            deadline = time.time() + TIME_LIMIT
+            path, _, _ = search.search(state_class, deadline)
+            if hasattr(search, 'close'):
+                search.close()
+            path = list(path) if path is not None else None
+            if path is None and time.time() >= deadline:
+                totals[name][2] += 1
+                continue
+            if path is None and expected is not None and exact is None:
+                error = None
+            elif expected is None or path is None:
+                error = None if expected is None and path is None else \
+                    'putanja {0}, a BreadthFirstSearch {1}'.format(
+                        'nije nadjena' if path is None else 'je nadjena',
+                        'je nema' if expected is None else 'je nasao')
+            else:
+                error = check_path(board, path, state_class)
+                if error is None and (len(path) < len(expected) or exact and len(path) > len(expected)):
+                    error = 'duzina {0}, a najkraca {1}'.format(len(path) - 1, len(expected) - 1)
+                if error is None:
+                    totals[name][3] += len(path) - len(expected)
+            totals[name][0] += path is not None
+            if error is not None:
+                totals[name][1] += 1
+                print('tabla {0} ({1}), {2}: {3}'.format(board_idx, state_class.__name__, name, error))
+                print('\n'.join(''.join(cells) for cells in board.data))
+
+
+
+def run_regression(count, seed=0):
+    """
+    Pokrece sve pretrage na count slucajnih tabli za oba nacina kretanja i sve provere tabli (BOARD_CHECKS)
+    i ispisuje zbir po pretrazi i po proveri.
+    :returns: broj gresaka
+    """
+    rng = random.Random(seed)
+    # ime -> [broj resenih, broj gresaka, broj prekinutih (TIME_LIMIT), visak poteza u odnosu na BreadthFirstSearch]
+    totals = dict((name, [0, 0, 0, 0]) for name, _, _, _ in STRATEGIES)
+    # ime -> [broj proverenih tabli, broj gresaka]
+    check_totals = dict((name, [0, 0]) for name, _ in BOARD_CHECKS)
+    directory = tempfile.mkdtemp()
+    try:
+        for board_idx in range(count):
+            board = make_random_board(rng)
+            run_strategies(board, board_idx, totals)
+            for name, check in BOARD_CHECKS:
+                error = check(board, directory)
+                check_totals[name][0] += 1
+                if error is not None:
+                    check_totals[name][1] += 1
+                    print('tabla {0}, {1}: {2}'.format(board_idx, name, error))
+                    print('\n'.join(''.join(cells) for cells in board.data))
+    finally:
+        shutil.rmtree(directory)
+
+    print('-' * 15, 'REGRESSION', '-' * 15)
+    print('{0:>32} {1:>8} {2:>8} {3:>8} {4:>8}'.format('search', 'solved', 'errors', 'timeouts', 'extra'))
+    for name, _, _, _ in STRATEGIES:
+        print('{0:>32} {1:>8} {2:>8} {3:>8} {4:>8}'.format(name, *totals[name]))
+    print('{0:>32} {1:>8} {2:>8}'.format('board check', 'checked', 'errors'))
+    for name, _ in BOARD_CHECKS:
+        print('{0:>32} {1:>8} {2:>8}'.format(name, *check_totals[name]))
+    return sum(total[1] for total in totals.values()) + sum(total[1] for total in check_totals.values())
+
+if __name__ == '__main__':
+    boards_count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    sys.exit(1 if run_regression(boards_count, seed) > 0 else 0)
@@ -1,65 +1,192 @@
 from __future__ import print_function
 
-from collections import deque
+from collections import deque, OrderedDict
 from abc import *
+from array import array
+import heapq
+import itertools
+import time
 from state import *
 
+INFINITY = float('inf')
+
+
+class PriorityStates(object):
+    """
+    Prioritetni red stanja (binarni heap) za vodjene pretrage.
+    Stanja sa jednakim prioritetom izlaze redom kojim su dodata (stabilno),
+    a izbacivanje i zamena stanja se rade lenjo - zastareli elementi heap-a
+    se samo oznace i preskacu prilikom preuzimanja.
+    """
+
+    def __init__(self, priority, states=()):
+        """
+        :param priority: funkcija koja za stanje vraca prioritet (manji je bolji)
+        :param states: pocetna stanja
+        """
+        self.priority = priority
+        self.heap = []  # elementi su liste [prioritet, redni broj, stanje]
+        self.entries = {}  # unique_hash -> element heap-a
+        self.counter = itertools.count()  # redni broj za stabilno razresavanje jednakih prioriteta
+        self.extend(states)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return (entry[2] for entry in self.entries.values())
+
+    def __contains__(self, state):
+        return state.unique_hash() in self.entries
+
+    def append(self, state):
+        """
+        Dodavanje stanja. Ako je stanje sa istim unique_hash vec u redu,
+        zadrzava se ono sa boljim prioritetom.
+        """
+        state_hash = state.unique_hash()
+        priority = self.priority(state)
+        old_entry = self.entries.get(state_hash)
+        if old_entry is not None:
+            if old_entry[0] <= priority:
+                return
+            old_entry[2] = None  # lenjo brisanje starog elementa
+        entry = [priority, next(self.counter), state]
+        self.entries[state_hash] = entry
+        heapq.heappush(self.heap, entry)
+
+    def extend(self, states):
+        for state in states:
+            self.append(state)
+
+    def remove(self, state):
+        entry = self.entries.pop(state.unique_hash())
+        entry[2] = None
+
+    def pop(self):
+        """
+        Preuzimanje stanja sa najmanjim prioritetom.
+        """
+        while self.heap:
+            priority, _, state = heapq.heappop(self.heap)
+            if state is not None:
+                del self.entries[state.unique_hash()]
+                return state
+        raise IndexError('pop from an empty PriorityStates')
+
+    popleft = pop
+
+    def peek_priority(self):
+        """
+        Najmanji prioritet u redu, bez preuzimanja stanja.
+        """
+        while self.heap and self.heap[0][2] is None:
+            heapq.heappop(self.heap)  # zastareli elementi
+        return self.heap[0][0]
+
 
 class Search(object):
     """
     Apstraktna klasa za pretragu.
     """
 
+    # da li se stanje koje je vec u listi stanja moze zameniti boljim (samo za prioritetne redove)
+    reopen_states = False
+    # da li search vraca procesirana stanja i listu stanja (za DEBUG u GUI-ju);
+    # ako ne, vraca se samo putanja kao lista, a brojaci ostaju u atributima pretrage
+    keep_states = True
+    # da li se pamte pozicije procesiranih stanja (redni broj polja, red * broj kolona + kolona) u expanded_positions
+    record_positions = False
+
     def __init__(self, board):
         self.board = board
-        self.max_depth = 2
+        self.processed_count = 0  # broj procesiranih stanja u poslednjoj pretrazi
+        self.generated_count = 0  # broj izgenerisanih sledecih stanja u poslednjoj pretrazi
+        self.expanded_positions = None  # array pozicija procesiranih stanja (ako je record_positions)
+        self.deadline = None  # trenutak prekida pretrage koja je u toku (za timed_out)
 
-    def search(self, initial_state):
+    def search(self, initial_state, deadline=None):
         """
         Implementirana pretraga.
 
         :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :param deadline: trenutak (time.time()) posle kog se pretraga prekida bez resenja; None - bez ogranicenja.
+                         Vazi za sve pretrage; podklase ga opisuju samo ako se prekid ponasa drugacije.
         :return: path, processed_list, states_list
         """
         # inicijalizacija pretrage
         initial_state = initial_state(self.board)  # pocetno stanje
-        states_list = deque([initial_state])  # deque - "brza" lista u Python-u
+        states_list = self.create_states_list([initial_state])  # deque - "brza" lista u Python-u
         states_set = {initial_state.unique_hash()}  # set - za brzu pretragu stanja
 
         processed_list = deque([])  # deque procesiranih stanja
         processed_set = set()  # set procesiranih stanja
+        self.reset_counters()
 
         # pretraga
         while len(states_list) > 0:  # dok ima stanja za obradu
+            if deadline is not None and time.time() >= deadline:  # isteklo je vreme
+                break
             curr_state = self.select_state(states_list)  # preuzmi sledece stanje za obradu
-            states_set.remove(curr_state.unique_hash())  # izbaci stanja iz seta stanja
+            curr_hash = curr_state.unique_hash()
+            states_set.remove(curr_hash)  # izbaci stanja iz seta stanja
 
-            processed_list.append(curr_state)  # ubaci stanje u listu procesiranih stanja
-            processed_set.add(curr_state.unique_hash())  # ubaci stanje u set procesiranih stanja
+            self.record_processed(curr_state, processed_list)  # ubaci stanje u listu procesiranih stanja
+            processed_set.add(curr_hash)  # ubaci stanje u set procesiranih stanja
 
             if curr_state.is_final_state():  # ako je krajnje stanje
                 # rekonsturisi putanju
-                return Search.reconstruct_path(curr_state), processed_list, states_list
+                return self.make_result(Search.reconstruct_path(curr_state), processed_list, states_list)
 
             # ako nije krajnje stanje
             # izgenerisi sledeca moguca stanja
             new_states = curr_state.get_next_states()
-            # iz liste sledecih mogucih stanja izbaci ona koja su vec u listi i koja su vec procesirana
-            new_states = [new_state for new_state in new_states if
-                          new_state.unique_hash() not in processed_set and
-                          new_state.unique_hash() not in states_set]
-            # dodaj sledeca moguca stanja na kraj liste stanja
-            states_list.extend(new_states)
-            # dodaj sledeca moguca stanja u set stanja
-            states_set.update([new_state.unique_hash() for new_state in new_states])
-        
-        # Samo u slucaju IterativeDepthFirstSearch-a pokrecemo opet, ali samo ako je dubina manja od 128.
-        if isinstance(self, IterativeDepthFirstSearch) and self.max_depth < 128:
-            # Uvecamo maksimalnu dubinu za 1 i opet iniciramo pretragu
-            self.max_depth += 1
-            return self.search(RobotState)
-        
-        return None, processed_list, states_list
+            self.generated_count += len(new_states)
+            for new_state in new_states:
+                new_hash = new_state.unique_hash()
+                # preskoci stanja koja su vec u listi i koja su vec procesirana
+                # (prioritetni red sam odlucuje da li zamenjuje stanje koje je vec u listi)
+                if new_hash in processed_set or (not self.reopen_states and new_hash in states_set):
+                    continue
+                # dodaj sledece moguce stanje na kraj liste stanja i u set stanja
+                states_list.append(new_state)
+                states_set.add(new_hash)
+
+        return self.make_result(None, processed_list, states_list)
+
+    def timed_out(self):
+        """
+        Da li je isteklo vreme pretrage (self.deadline postavlja search koji ga proverava).
+        """
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def reset_counters(self):
+        """
+        Priprema brojace za novu pretragu.
+        """
+        self.processed_count = 0
+        self.generated_count = 0
+        self.expanded_positions = array('l') if self.record_positions else None
+
+    def record_processed(self, state, processed_list):
+        """
+        Belezi procesirano stanje: broji ga, cuva u listi procesiranih stanja (ako je keep_states,
+        a processed_list nije None) i pamti njegovu poziciju (ako je record_positions).
+        """
+        self.processed_count += 1
+        if self.keep_states and processed_list is not None:
+            processed_list.append(state)
+        if self.expanded_positions is not None:
+            self.expanded_positions.append(state.position[0] * self.board.cols + state.position[1])
+
+    def make_result(self, path, processed_list, states_list):
+        """
+        Rezultat pretrage u zavisnosti od keep_states.
+        :return: path, processed_list, states_list
+        """
+        if self.keep_states:
+            return path, processed_list, states_list
+        return list(path) if path is not None else None, deque([]), deque([])
 
     @staticmethod
     def reconstruct_path(final_state):
@@ -69,6 +196,44 @@ class Search(object):
             final_state = final_state.parent
         return reversed(path)
 
+    @staticmethod
+    def reconstruct_bidirectional_path(forward_state, backward_state):
+        """
+        Spaja putanje dve pretrage koje su se srele u istom stanju.
+        :param forward_state: stanje pretrage od pocetka
+        :param backward_state: isto stanje, dostignuto pretragom od cilja
+        :return: putanja od pocetka do cilja
+        """
+        path = list(Search.reconstruct_path(forward_state))
+        backward_state = backward_state.parent
+        while backward_state is not None:
+            path.append(backward_state.position)
+            backward_state = backward_state.parent
+        return path
+
+    def create_backward_state(self, initial_state, forward_state):
+        """
+        Pravi inicijalno stanje pretrage unazad: krece se sa cilja, a cilj je pocetna pozicija.
+        """
+        return initial_state(self.board, None, forward_state.goal_position, forward_state.position)
+
+    def is_bidirectional(self, forward_state):
+        """
+        Dvosmerna pretraga ima smisla samo za table sa jednim ciljem (bez kutija za skupljanje).
+        """
+        return forward_state.goal_position is not None and forward_state.goal_position[0] is not None and \
+            len(self.board.boxes) == 0
+
+    def create_states_list(self, states):
+        """
+        Pravi strukturu podataka za listu stanja koja cekaju na obradu.
+        Podrazumevano je deque, a vodjene pretrage je menjaju prioritetnim redom.
+
+        :param states: pocetna stanja
+        :return: lista stanja
+        """
+        return deque(states)
+
     @abstractmethod
     def select_state(self, states):
         """
@@ -82,6 +247,30 @@ class Search(object):
         pass
 
 
+class BoardListener(object):
+    """
+    Dodatak za pretrage koje cuvaju izracunato stanje izmedju pretraga i prate izmene table:
+    listen() prijavljuje cell_changed na izmene table (board.listeners), a close() ga odjavljuje.
+    """
+
+    def listen(self):
+        self.board.listeners.append(self.cell_changed)
+
+    def cell_changed(self, row, col):
+        """
+        Poziva se posle izmene celije table (row, col), ili sa None, None ako se izmenila cela tabla.
+        """
+        pass
+
+    def close(self):
+        """
+        Odjava sa izmena table, da tabla ne bi drzala pretragu u memoriji.
+        Poziva se kada pretraga vise nije potrebna; posle toga izmene table se ne prate.
+        """
+        if self.cell_changed in self.board.listeners:
+            self.board.listeners.remove(self.cell_changed)
+
+
 class BreadthFirstSearch(Search):
     def select_state(self, states):
         # struktura podataka je red (queue)
@@ -89,6 +278,65 @@ class BreadthFirstSearch(Search):
         return states.popleft()
 
 
+class BidirectionalBreadthFirstSearch(BreadthFirstSearch):
+    """
+    Dvosmerna pretraga u sirinu: istovremeno se pretrazuje od pocetne pozicije i od cilja,
+    uvek se prosiruje ceo nivo manjeg fronta, a pretraga staje kad se frontovi sretnu.
+    Pretpostavlja da su potezi simetricni (ako moze a -> b, moze i b -> a).
+    Za table sa kutijama radi kao obicna pretraga u sirinu.
+    """
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :return: path, processed_list, states_list
+        """
+        forward_state = initial_state(self.board)
+        if not self.is_bidirectional(forward_state):
+            return super(BidirectionalBreadthFirstSearch, self).search(initial_state, deadline)
+        backward_state = self.create_backward_state(initial_state, forward_state)
+
+        self.reset_counters()
+        processed_list = deque([])
+        if forward_state.unique_hash() == backward_state.unique_hash():
+            return self.make_result(Search.reconstruct_bidirectional_path(forward_state, backward_state),
+                                    processed_list, deque([]))
+
+        # za svaki smer: lista stanja i dostignuta stanja (unique_hash -> stanje)
+        states_lists = [deque([forward_state]), deque([backward_state])]
+        reached = [{forward_state.unique_hash(): forward_state}, {backward_state.unique_hash(): backward_state}]
+
+        while len(states_lists[0]) > 0 and len(states_lists[1]) > 0:
+            side = 0 if len(states_lists[0]) <= len(states_lists[1]) else 1
+            states_list, own, other = states_lists[side], reached[side], reached[1 - side]
+            best = None  # (duzina, stanje unapred, stanje unazad)
+            # prosiri ceo nivo, pa izaberi najkrace spajanje na tom nivou
+            for _ in range(len(states_list)):
+                if deadline is not None and time.time() >= deadline:  # isteklo je vreme
+                    return self.make_result(None, processed_list, deque(itertools.chain(*states_lists)))
+                curr_state = states_list.popleft()
+                self.record_processed(curr_state, processed_list)
+                new_states = curr_state.get_next_states()
+                self.generated_count += len(new_states)
+                for new_state in new_states:
+                    new_hash = new_state.unique_hash()
+                    if new_hash in own:
+                        continue
+                    own[new_hash] = new_state
+                    states_list.append(new_state)
+                    meeting_state = other.get(new_hash)
+                    if meeting_state is not None:
+                        length = new_state.depth + meeting_state.depth
+                        if best is None or length < best[0]:
+                            best = (length, new_state, meeting_state) if side == 0 else \
+                                (length, meeting_state, new_state)
+            if best is not None:
+                path = Search.reconstruct_bidirectional_path(best[1], best[2])
+                return self.make_result(path, processed_list, deque(itertools.chain(*states_lists)))
+
+        return self.make_result(None, processed_list, deque(itertools.chain(*states_lists)))
+
+
 class DepthFirstSearch(Search):
     def select_state(self, states):
         # TODO 1: Rijesen zadatak implementiranja DFS-a
@@ -96,41 +344,593 @@ class DepthFirstSearch(Search):
 
 
 class IterativeDepthFirstSearch(Search):
-    def select_state(self, states):
+    """
+    Iterativna pretraga po dubini. Svaki prolaz je DFS ogranicen granicom (dubinom),
+    a granica se povecava dok se ne nadje resenje ili dok nijedno stanje nije odseceno.
+    Pamti se samo trenutna putanja (stek), pa je memorija srazmerna dubini resenja.
+    """
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :return: path, processed_list, states_list (liste su prazne, jer se stanja ne cuvaju)
+        """
         # TODO 2: Rijesen zadatk implementiranja IDFS-a
-        while len(states) != 0:
-            state = states.pop()
-            if state.depth <= self.max_depth:
-                return state
+        initial_state = initial_state(self.board)
+        self.reset_counters()
+        self.deadline = deadline
+        bound = self.bound_value(initial_state)
+        while bound is not None:
+            path, bound = self.bounded_search(initial_state, bound)
+            if path is not None:
+                return self.make_result(path, deque([]), deque([]))
+        return None, deque([]), deque([])
 
+    def bounded_search(self, initial_state, bound):
+        """
+        Jedan prolaz pretrage po dubini, bez rekurzije.
+        Ciklusi se proveravaju samo u odnosu na stanja sa trenutne putanje.
+
+        :param initial_state: pocetno stanje
+        :param bound: granica za vrednost bound_value
+        :return: (putanja ili None, najmanja vrednost iznad granice ili None ako nista nije odseceno)
+        """
+        next_bound = None
+        path_set = {initial_state.unique_hash()}  # stanja na trenutnoj putanji
+        stack = [[initial_state, None]]  # [stanje, iterator kroz sledeca stanja]
+        while len(stack) > 0:
+            if self.timed_out():  # isteklo je vreme
+                return None, None
+            frame = stack[-1]
+            curr_state = frame[0]
+            if frame[1] is None:  # stanje se prvi put obradjuje
+                self.record_processed(curr_state, None)
+                if curr_state.is_final_state():
+                    return Search.reconstruct_path(curr_state), None
+                new_states = curr_state.get_next_states()
+                self.generated_count += len(new_states)
+                frame[1] = iter(new_states)
+
+            new_state = next(frame[1], None)
+            if new_state is None:  # sva sledeca stanja su obradjena, vrati se nazad
+                stack.pop()
+                path_set.discard(curr_state.unique_hash())
+                continue
+
+            new_hash = new_state.unique_hash()
+            if new_hash in path_set:  # ciklus na trenutnoj putanji
+                continue
+            if self.is_pruned(new_hash, new_state):
+                continue
+            value = self.bound_value(new_state)
+            if value > bound:  # odseci, ali zapamti za sledeci prolaz
+                if next_bound is None or value < next_bound:
+                    next_bound = value
+                continue
+            path_set.add(new_hash)
+            stack.append([new_state, None])
+        return None, next_bound
+
+    def bound_value(self, state):
+        """
+        Vrednost koja se poredi sa granicom pretrage - za IDFS je to dubina stanja.
+        """
+        return state.depth
+
+    def is_pruned(self, state_hash, state):
+        """
+        Da li stanje treba preskociti iako nije na trenutnoj putanji.
+        IDFS ne pamti nista van putanje, pa nista ne preskace.
+        """
+        return False
 
-class GreedySearch(Search):
     def select_state(self, states):
+        return states.pop()
+
+
+class TranspositionTable(object):
+    """
+    Tabela fiksne velicine koja za stanje (unique_hash) pamti najmanju cenu
+    (get_current_cost) sa kojom je stanje dostignuto.
+    Politike zamene:
+    - 'LRU': kad je tabela puna, izbacuje se najdavnije korisceno stanje
+    - 'DEPTH': svako stanje ima svoje mesto (slot) u tabeli, a stanje sa manjom cenom
+      (blize pocetku, sa vecim podstablom) istiskuje ono sa vecom cenom
+    """
+
+    def __init__(self, size, policy='LRU'):
+        """
+        :param size: najveci broj stanja u tabeli
+        :param policy: 'LRU' ili 'DEPTH'
+        """
+        if policy not in ('LRU', 'DEPTH'):
+            raise ValueError('Unknown transposition table policy: {0}'.format(policy))
+        self.size = size
+        self.policy = policy
+        self.clear()
+
+    def clear(self):
+        if self.policy == 'LRU':
+            self.entries = OrderedDict()
+        else:
+            self.slots = [None] * self.size
+
+    def get(self, key):
+        """
+        :return: zapamcena cena za stanje ili None
+        """
+        if self.policy == 'LRU':
+            cost = self.entries.pop(key, None)
+            if cost is not None:
+                self.entries[key] = cost  # stanje postaje najskorije korisceno
+            return cost
+        slot = self.slots[hash(key) % self.size]
+        if slot is not None and slot[0] == key:
+            return slot[1]
+        return None
+
+    def put(self, key, cost):
+        if self.policy == 'LRU':
+            self.entries.pop(key, None)
+            self.entries[key] = cost
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        else:
+            idx = hash(key) % self.size
+            slot = self.slots[idx]
+            if slot is None or slot[0] == key or cost <= slot[1]:
+                self.slots[idx] = (key, cost)
+
+
+class IDAStarSearch(IterativeDepthFirstSearch):
+    """
+    IDA* - iterativna pretraga po dubini sa granicom na f = get_current_cost() + get_cost().
+    Memorija je srazmerna dubini resenja i velicini (opcione) tabele transpozicija,
+    a cena je ponovno obradjivanje stanja u svakom prolazu.
+    """
+
+    def __init__(self, board, table_size=None, table_policy='LRU'):
+        """
+        :param board: Board (tabla)
+        :param table_size: velicina tabele transpozicija (None - bez tabele)
+        :param table_policy: politika zamene u tabeli, 'LRU' ili 'DEPTH'
+        """
+        super(IDAStarSearch, self).__init__(board)
+        self.table = TranspositionTable(table_size, table_policy) if table_size else None
+
+    def bounded_search(self, initial_state, bound):
+        # tabela vazi samo za jedan prolaz, jer vise granice dozvoljavaju dublje podstablo
+        if self.table is not None:
+            self.table.clear()
+        return super(IDAStarSearch, self).bounded_search(initial_state, bound)
+
+    def bound_value(self, state):
+        return state.get_current_cost() + state.get_cost()
+
+    def is_pruned(self, state_hash, state):
+        # ako je stanje u ovom prolazu vec dostignuto sa istom ili manjom cenom, njegovo podstablo je vec pretrazeno
+        if self.table is None:
+            return False
+        cost = state.get_current_cost()
+        best_cost = self.table.get(state_hash)
+        if best_cost is not None and best_cost <= cost:
+            return True
+        self.table.put(state_hash, cost)
+        return False
+
+
+class GreedySearch(Search):
+    reopen_states = True
+
+    def create_states_list(self, states):
         # TODO 3: Implementiran GreedySearch algoritam. Gledamo samo unaprijed.
-        best_state = states[0]
-        best_heuristic = best_state.get_cost()
-        
-        for state in states:
-            heuristic = state.get_cost()
-            if heuristic < best_heuristic:
-                best_heuristic = heuristic
-                best_state = state
-                
-        states.remove(best_state)
-        return best_state
+        # Stanja se cuvaju u heap-u po heuristici, pa je izbor sledeceg stanja O(log n)
+        return PriorityStates(lambda state: state.get_cost(), states)
+
+    def select_state(self, states):
+        return states.pop()
 
 
 class AStarSearch(Search):
-    def select_state(self, states):
+    reopen_states = True
+
+    def create_states_list(self, states):
         # TODO 4: Implementiran A* algoritam. Uzimamo u obzir i koliko smo vec 'potrosili'
-        best_state = states[0]
-        best_heuristic = best_state.get_current_cost() + best_state.get_cost()
-        
-        for state in states:
-            heuristic = state.get_current_cost() + state.get_cost()
-            if heuristic < best_heuristic:
-                best_heuristic = heuristic
-                best_state = state
-                
-        states.remove(best_state)
-        return best_state
+        return PriorityStates(self.priority, states)
+
+    @staticmethod
+    def priority(state):
+        # kod jednakih f prednost ima stanje blize cilju, pa se sa tacnom heuristikom obradjuje samo putanja
+        cost = state.get_cost()
+        return state.get_current_cost() + cost, cost
+
+    def select_state(self, states):
+        return states.pop()
+
+
+class BidirectionalAStarSearch(AStarSearch):
+    """
+    Dvosmerni A*: jedan A* ide od pocetne pozicije ka cilju, drugi od cilja ka pocetnoj poziciji.
+    Prosiruje se strana sa manjim frontom. Najkraca putanja kroz susret (mu) je konacna
+    kada najmanja vrednost f na nekoj strani dostigne mu (uz dopustivu i konzistentnu heuristiku).
+    Za table sa kutijama radi kao obican A*.
+    """
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :return: path, processed_list, states_list
+        """
+        forward_state = initial_state(self.board)
+        if not self.is_bidirectional(forward_state):
+            return super(BidirectionalAStarSearch, self).search(initial_state, deadline)
+        backward_state = self.create_backward_state(initial_state, forward_state)
+
+        self.reset_counters()
+        processed_list = deque([])
+        states_lists = [self.create_states_list([forward_state]), self.create_states_list([backward_state])]
+        # za svaki smer: najbolje dostignuto stanje (unique_hash -> stanje) i procesirana stanja
+        reached = [{forward_state.unique_hash(): forward_state}, {backward_state.unique_hash(): backward_state}]
+        processed_sets = [set(), set()]
+        best = None  # (duzina, stanje unapred, stanje unazad)
+        if forward_state.unique_hash() == backward_state.unique_hash():
+            best = (0, forward_state, backward_state)
+
+        while len(states_lists[0]) > 0 and len(states_lists[1]) > 0:
+            if best is not None and max(states_lists[0].peek_priority()[0],
+                                        states_lists[1].peek_priority()[0]) >= best[0]:
+                break
+            if deadline is not None and time.time() >= deadline:  # isteklo je vreme
+                return self.make_result(None, processed_list, deque(itertools.chain(*states_lists)))
+            side = 0 if len(states_lists[0]) <= len(states_lists[1]) else 1
+            states_list, own, other = states_lists[side], reached[side], reached[1 - side]
+            curr_state = self.select_state(states_list)
+            curr_hash = curr_state.unique_hash()
+            processed_sets[side].add(curr_hash)
+            self.record_processed(curr_state, processed_list)
+
+            new_states = curr_state.get_next_states()
+            self.generated_count += len(new_states)
+            for new_state in new_states:
+                new_hash = new_state.unique_hash()
+                if new_hash in processed_sets[side]:
+                    continue
+                old_state = own.get(new_hash)
+                if old_state is not None and old_state.get_current_cost() <= new_state.get_current_cost():
+                    continue
+                own[new_hash] = new_state
+                states_list.append(new_state)
+                meeting_state = other.get(new_hash)
+                if meeting_state is not None:
+                    # stanje ima cenu 1 za pocetnu poziciju, pa se pri spajanju jednom oduzima
+                    length = new_state.get_current_cost() + meeting_state.get_current_cost() - 1
+                    if best is None or length < best[0]:
+                        best = (length, new_state, meeting_state) if side == 0 else \
+                            (length, meeting_state, new_state)
+
+        states_list = deque(itertools.chain(*states_lists))
+        if best is None:
+            return self.make_result(None, processed_list, states_list)
+        return self.make_result(Search.reconstruct_bidirectional_path(best[1], best[2]), processed_list, states_list)
+
+
+class JumpPointSearch(AStarSearch):
+    """
+    Jump Point Search (JPS) - A* za kretanje po mrezi sa jednakom cenom poteza.
+    Umesto svih susednih polja, iz stanja se "skace" u pravcu kretanja dok se ne naidje
+    na polje sa prinudnim susedom, na cilj ili na portal, pa se obradjuju samo takve
+    skakacke tacke (jump points). Simetricne putanje kroz prazne prostorije se ne obradjuju.
+    Radi za kretanje u 4 smera (OrthogonalRobotState) i u 8 smerova (RobotState),
+    gde dijagonalni potez kosta isto kao pravi (rastojanje je Chebyshev).
+    Portali su uvek skakacke tacke. Za table sa kutijama radi kao obican A*.
+    """
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :return: path, processed_list, states_list
+        """
+        directions = set(zip(getattr(initial_state, 'd_rows', []), getattr(initial_state, 'd_cols', [])))
+        straight = {(0, 1), (0, -1), (1, 0), (-1, 0)}
+        diagonal = {(1, 1), (1, -1), (-1, 1), (-1, -1)}
+        forward_state = initial_state(self.board)
+        if directions not in (straight, straight | diagonal) or not self.is_bidirectional(forward_state):
+            return super(JumpPointSearch, self).search(initial_state, deadline)
+
+        self.deadline = deadline
+        self.diagonal = directions == straight | diagonal
+        self.d_rows, self.d_cols = initial_state.d_rows, initial_state.d_cols
+        self.goal = forward_state.goal_position
+        self.portals = self.board.find_elements('p')
+        self.cells = self.board.get_cells()  # tabla se ne menja tokom pretrage
+        self.wall, self.portal = self.board.elems.index('w'), self.board.elems.index('p')
+
+        g = {forward_state.position: 0}  # najmanja poznata cena do skakacke tacke
+        states_list = PriorityStates(lambda state: g[state.position] + self.heuristic(state.position),
+                                     [forward_state])
+        processed_set = set()
+        processed_list = deque([])
+        self.reset_counters()
+
+        while len(states_list) > 0:
+            if self.timed_out():
+                break
+            curr_state = states_list.pop()
+            processed_set.add(curr_state.position)
+            self.record_processed(curr_state, processed_list)
+
+            if curr_state.position == self.goal:
+                return self.make_result(self.reconstruct_jump_path(curr_state, g), processed_list, states_list)
+
+            jump_points = self.get_jump_points(curr_state)
+            self.generated_count += len(jump_points)
+            for jump_position, cost in jump_points:
+                if jump_position in processed_set:
+                    continue
+                new_cost = g[curr_state.position] + cost
+                if jump_position in g and g[jump_position] <= new_cost:
+                    continue
+                g[jump_position] = new_cost
+                states_list.append(initial_state(self.board, curr_state, jump_position, self.goal))
+
+        return self.make_result(None, processed_list, states_list)
+
+    def walkable(self, row, col):
+        cols = self.board.cols
+        return 0 <= row < self.board.rows and 0 <= col < cols and self.cells[row * cols + col] != self.wall
+
+    def distance(self, position, other):
+        d_row, d_col = abs(position[0] - other[0]), abs(position[1] - other[1])
+        return max(d_row, d_col) if self.diagonal else d_row + d_col
+
+    def heuristic(self, position):
+        # direktno rastojanje ili put preko najblizeg portala, sto je manje (dopustivo i sa portalima)
+        return self.board.get_grid_estimate(position, self.goal, self.d_rows, self.d_cols)
+
+    def get_neighbours(self, state):
+        """
+        Susedi koji nisu odseceni (pruned) s obzirom na pravac iz kog se stiglo u stanje.
+        Iz pocetnog stanja i sa portala obradjuju se svi smerovi.
+        """
+        row, col = state.position
+        if state.parent is None or self.cells[row * self.board.cols + col] == self.portal:
+            return [(d_row, d_col) for d_row, d_col in zip(state.d_rows, state.d_cols)]
+
+        p_row, p_col = state.parent.position
+        d_row = (row > p_row) - (row < p_row)
+        d_col = (col > p_col) - (col < p_col)
+        walkable = self.walkable
+        directions = []
+        if not self.diagonal:
+            if d_col != 0:
+                directions = [(0, d_col), (-1, 0), (1, 0)]
+            else:
+                directions = [(d_row, 0), (0, -1), (0, 1)]
+        elif d_row != 0 and d_col != 0:
+            directions = [(d_row, 0), (0, d_col), (d_row, d_col)]
+            if not walkable(row, col - d_col):
+                directions.append((d_row, -d_col))
+            if not walkable(row - d_row, col):
+                directions.append((-d_row, d_col))
+        elif d_col != 0:
+            directions = [(0, d_col)]
+            if not walkable(row + 1, col):
+                directions.append((1, d_col))
+            if not walkable(row - 1, col):
+                directions.append((-1, d_col))
+        else:
+            directions = [(d_row, 0)]
+            if not walkable(row, col + 1):
+                directions.append((d_row, 1))
+            if not walkable(row, col - 1):
+                directions.append((d_row, -1))
+        return directions
+
+    def get_jump_points(self, state):
+        """
+        :return: lista (skakacka tacka, cena do nje) za stanje
+        """
+        jump_points = []
+        for d_row, d_col in self.get_neighbours(state):
+            if self.timed_out():  # skok moze preci celu tablu, pa se rok proverava i izmedju smerova
+                return []
+            jump_position = self.jump(state.position, d_row, d_col)
+            if jump_position is not None:
+                jump_points.append((jump_position, self.distance(state.position, jump_position)))
+        if state.position in self.portals:
+            jump_points.extend([(portal, 1) for portal in self.portals if portal != state.position])
+        return jump_points
+
+    def jump(self, position, d_row, d_col):
+        """
+        Skok iz pozicije u zadatom smeru, bez rekurzije.
+        :return: prva skakacka tacka u tom smeru ili None
+        """
+        walkable = self.walkable
+        row, col = position
+        while True:
+            row += d_row
+            col += d_col
+            if not walkable(row, col):
+                return None
+            if (row, col) == self.goal or self.cells[row * self.board.cols + col] == self.portal:
+                return row, col
+            if self.diagonal:
+                if d_row != 0 and d_col != 0:
+                    if (walkable(row + d_row, col - d_col) and not walkable(row, col - d_col)) or \
+                            (walkable(row - d_row, col + d_col) and not walkable(row - d_row, col)):
+                        return row, col
+                    # dijagonalni potez je skakacka tacka ako se iz nje pravo moze stici do skakacke tacke
+                    if self.jump((row, col), d_row, 0) is not None or self.jump((row, col), 0, d_col) is not None:
+                        return row, col
+                elif d_col != 0:
+                    if (walkable(row + 1, col + d_col) and not walkable(row + 1, col)) or \
+                            (walkable(row - 1, col + d_col) and not walkable(row - 1, col)):
+                        return row, col
+                else:
+                    if (walkable(row + d_row, col + 1) and not walkable(row, col + 1)) or \
+                            (walkable(row + d_row, col - 1) and not walkable(row, col - 1)):
+                        return row, col
+            else:
+                if d_col != 0:
+                    if (walkable(row - 1, col) and not walkable(row - 1, col - d_col)) or \
+                            (walkable(row + 1, col) and not walkable(row + 1, col - d_col)):
+                        return row, col
+                else:
+                    if (walkable(row, col - 1) and not walkable(row - d_row, col - 1)) or \
+                            (walkable(row, col + 1) and not walkable(row - d_row, col + 1)):
+                        return row, col
+                    # vertikalni potez je skakacka tacka ako se iz nje horizontalno stize do skakacke tacke
+                    if self.jump((row, col), 0, 1) is not None or self.jump((row, col), 0, -1) is not None:
+                        return row, col
+
+    def reconstruct_jump_path(self, final_state, g):
+        """
+        Rekonstrukcija putanje izmedju skakackih tacaka, polje po polje.
+        Ako je cena izmedju dve skakacke tacke 1, a nisu susedne, u pitanju je teleportovanje.
+        """
+        jump_path = list(Search.reconstruct_path(final_state))
+        path = [jump_path[0]]
+        for position, next_position in zip(jump_path, jump_path[1:]):
+            steps = g[next_position] - g[position]
+            if self.distance(position, next_position) != steps:  # teleportovanje sa portala na portal
+                path.append(next_position)
+                continue
+            d_row = (next_position[0] > position[0]) - (next_position[0] < position[0])
+            d_col = (next_position[1] > position[1]) - (next_position[1] < position[1])
+            for step in range(1, steps + 1):
+                path.append((position[0] + step * d_row, position[1] + step * d_col))
+        return path
+
+
+class AnytimeAStarSearch(AStarSearch):
+    """
+    Anytime A* (ARA*): prvo brzo nalazi putanju sa naduvanom heuristikom (f = g + weight * h),
+    pa dok ima vremena smanjuje tezinu i popravlja putanju, koristeci vec obradjena stanja.
+    Kada tezina stigne do 1, putanja je optimalna (uz dopustivu heuristiku).
+    Pretraga uvek vraca najbolju putanju nadjenu do isteka roka (deadline).
+    """
+
+    def __init__(self, board, weight=3.0, weight_step=0.5):
+        """
+        :param board: Board (tabla)
+        :param weight: pocetna tezina heuristike
+        :param weight_step: za koliko se tezina smanjuje posle svake nadjene putanje
+        """
+        super(AnytimeAStarSearch, self).__init__(board)
+        self.initial_weight = weight
+        self.weight_step = weight_step
+        self.weight = weight
+        self.solutions = []  # (vreme od pocetka, duzina putanje, tezina) za svaku nadjenu putanju
+
+    def priority(self, state):
+        cost = state.get_cost()
+        return state.get_current_cost() + self.weight * cost, cost
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :param deadline: trenutak (time.time()) do kog se putanja popravlja; None - do optimalne putanje
+        :return: path, processed_list, states_list
+        """
+        start_time = time.time()
+        initial_state = initial_state(self.board)
+        self.weight = self.initial_weight
+        self.solutions = []
+        self.reset_counters()
+
+        best = {initial_state.unique_hash(): initial_state}  # najbolje dostignuto stanje za svaki hash
+        states_list = self.create_states_list([initial_state])
+        processed_list = deque([])
+        incumbent = initial_state if initial_state.is_final_state() else None
+
+        while True:
+            # popravka putanje sa trenutnom tezinom
+            processed_set = set()
+            inconsistent = {}  # vec obradjena stanja kojima je u ovom prolazu nadjena bolja cena
+            timed_out = False
+            while len(states_list) > 0:
+                if incumbent is not None and states_list.peek_priority()[0] >= incumbent.get_current_cost():
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    timed_out = True
+                    break
+                curr_state = states_list.pop()
+                curr_hash = curr_state.unique_hash()
+                processed_set.add(curr_hash)
+                self.record_processed(curr_state, processed_list)
+                new_states = curr_state.get_next_states()
+                self.generated_count += len(new_states)
+                for new_state in new_states:
+                    new_hash = new_state.unique_hash()
+                    old_state = best.get(new_hash)
+                    if old_state is not None and old_state.get_current_cost() <= new_state.get_current_cost():
+                        continue
+                    best[new_hash] = new_state
+                    if new_state.is_final_state():
+                        if incumbent is None or new_state.get_current_cost() < incumbent.get_current_cost():
+                            incumbent = new_state
+                    if new_hash in processed_set:
+                        inconsistent[new_hash] = new_state
+                    else:
+                        states_list.append(new_state)
+
+            if incumbent is not None and (len(self.solutions) == 0 or
+                                          self.solutions[-1][1] != incumbent.get_current_cost()):
+                self.solutions.append((time.time() - start_time, incumbent.get_current_cost(), self.weight))
+            if timed_out or self.weight <= 1:
+                break
+            # smanji tezinu i nastavi sa svim stanjima koja cekaju, ukljucujuci nekonzistentna
+            self.weight = max(1.0, self.weight - self.weight_step)
+            states_list = self.create_states_list(list(states_list) + list(inconsistent.values()))
+
+        path = Search.reconstruct_path(incumbent) if incumbent is not None else None
+        return self.make_result(path, processed_list, states_list)
+
+
+class BeamSearch(Search):
+    """
+    Pretraga snopom (beam search): pretraga u sirinu koja na svakom nivou (dubini) zadrzava
+    samo width najboljih stanja po funkciji ocene. Memorija i vreme po nivou su ograniceni,
+    ali pretraga nije ni potpuna ni optimalna.
+    """
+
+    def __init__(self, board, width=100, scoring=None):
+        """
+        :param board: Board (tabla)
+        :param width: najveci broj stanja koja se zadrzavaju na jednom nivou
+        :param scoring: funkcija koja za stanje vraca ocenu (manja je bolja); podrazumevano get_cost()
+        """
+        super(BeamSearch, self).__init__(board)
+        self.width = width
+        self.scoring = scoring if scoring is not None else (lambda state: state.get_cost())
+
+    def search(self, initial_state, deadline=None):
+        """
+        :param initial_state: Inicijalno stanje. Tip: implementacija apstraktne klase State.
+        :return: path, processed_list, states_list (procesirana stanja se ne cuvaju)
+        """
+        initial_state = initial_state(self.board)
+        self.reset_counters()
+        layer = [initial_state]  # stanja na trenutnom nivou
+        reached_set = {initial_state.unique_hash()}  # set stanja koja su bila u snopu
+
+        while len(layer) > 0:
+            if deadline is not None and time.time() >= deadline:
+                break
+            next_layer = {}  # unique_hash -> stanje, za sledeci nivo
+            for curr_state in layer:
+                self.record_processed(curr_state, None)
+                if curr_state.is_final_state():
+                    return self.make_result(Search.reconstruct_path(curr_state), deque([]), deque(layer))
+                new_states = curr_state.get_next_states()
+                self.generated_count += len(new_states)
+                for new_state in new_states:
+                    new_hash = new_state.unique_hash()
+                    if new_hash not in reached_set and new_hash not in next_layer:
+                        next_layer[new_hash] = new_state
+            # zadrzi samo width najboljih stanja
+            layer = heapq.nsmallest(self.width, next_layer.values(), key=self.scoring)
+            reached_set.update(state.unique_hash() for state in layer)
+
+        return self.make_result(None, deque([]), deque(layer))
@@ -1,14 +1,17 @@
 from __future__ import print_function
 
 from abc import *
-import copy
 
 
 class State(object):
     """
     Apstraktna klasa koja opisuje stanje pretrage.
+    Stanja koriste __slots__ (bez __dict__ po stanju), pa podklase koje dodaju atribute
+    treba da ih navedu u svojim __slots__.
     """
 
+    __slots__ = ('board', 'parent', 'position', 'goal_position', 'depth', 'picked_boxes')
+
     @abstractmethod
     def __init__(self, board, parent=None, position=None, goal_position=None):
         """
@@ -22,16 +25,21 @@ class State(object):
         self.parent = parent  # roditeljsko stanje
         
         if self.parent is None:  # ako nema roditeljsko stanje, onda je ovo inicijalno stanje
-            self.position = board.find_position(self.get_agent_code())  # pronadji pocetnu poziciju
-            self.goal_position = board.find_position(self.get_agent_goal_code())  # pronadji krajnju poziciju
+            # ako pozicije nisu eksplicitno zadate, pronadji ih na tabli
+            if position is None:
+                position = board.find_position(self.get_agent_code())  # pronadji pocetnu poziciju
+            if goal_position is None:
+                goal_position = board.find_position(self.get_agent_goal_code())  # pronadji krajnju poziciju
+            self.position = position
+            self.goal_position = goal_position
         else:  # ako ima roditeljsko stanje, samo sacuvaj vrednosti parametara
             self.position = position
             self.goal_position = goal_position
             
         self.depth = parent.depth + 1 if parent is not None else 1  # povecaj dubinu/nivo pretrage
         
-        # Spisak pokupljenih kutija
-        self.picked_boxes = copy.deepcopy(parent.picked_boxes) if parent is not None else []
+        # Pokupljene kutije kao bit maska (bit i - kutija board.boxes[i]); int je nepromenljiv, pa se ne kopira
+        self.picked_boxes = parent.picked_boxes if parent is not None else 0
 
     def get_next_states(self):
         new_positions = self.get_legal_positions()  # dobavi moguce (legalne) sledece pozicije iz trenutne pozicije
@@ -78,9 +86,9 @@ class State(object):
     @abstractmethod
     def unique_hash(self):
         """
-        Apstraktna metoda koja treba da vrati string koji je JEDINSTVEN za ovo stanje
-        (u odnosu na ostala stanja).
-        :return: str
+        Apstraktna metoda koja treba da vrati kljuc (int ili str) koji je JEDINSTVEN za ovo stanje
+        (u odnosu na ostala stanja). Poziva se vise puta po stanju, pa treba da bude jeftin.
+        :return: int ili str
         """
         pass
     
@@ -105,21 +113,29 @@ class State(object):
 
 
 class RobotState(State):
+    # d_rows (delta rows), d_cols (delta columns)
+    # moguci smerovi kretanja robota (desno, levo, dole, gore i dijagonale)
+    # TODO 5: Rijesen smijer kretanja robota - moze i dijagonalno
+    d_rows = [0, 0, 1, -1, -1, -1, 1, 1]
+    d_cols = [1, -1, 0, 0, -1, 1, -1, 1]
+
+    __slots__ = ('key', 'has_boxes')
+
     def __init__(self, board, parent=None, position=None, goal_position=None):
-        super(self.__class__, self).__init__(board, parent, position, goal_position)
+        super(RobotState, self).__init__(board, parent, position, goal_position)
         # posle pozivanja super konstruktora, mogu se dodavati "custom" stvari vezani za stanje
         # TODO 6 i TODO 8: prosiriti stanje sa informacijom da li je robot pokupio sve kutije
-        if parent is not None:
-            self.picked_boxes = copy.deepcopy(parent.picked_boxes)
-        else:
-            self.picked_boxes = []
-
-        # Ako smo trenutno na polju koje je kutija dodamo kutiju
-        if self.position in board.boxes and self.position not in self.picked_boxes:
-            self.picked_boxes.append(self.position)
+        # Ako smo trenutno na polju koje je kutija dodamo kutiju (indeks kutija tabla pravi jednom)
+        box = board.box_index.get(self.position)
+        if box is not None:
+            self.picked_boxes |= 1 << box
+
+        # Kljuc stanja se racuna jednom: redni broj polja + maska kutija * broj polja
+        cells = board.rows * board.cols
+        self.key = self.position[0] * board.cols + self.position[1] + self.picked_boxes * cells
         
-        # Ako je broj kutija jednak broju svih kutija ili roditelj ima sve kutije
-        self.has_boxes = (len(self.picked_boxes) == len(board.boxes)) or (parent is not None and parent.has_boxes)
+        # Robot ima sve kutije ako su postavljeni svi bitovi maske
+        self.has_boxes = self.picked_boxes == (1 << len(board.boxes)) - 1
 
     def get_agent_code(self):
         return 'r'
@@ -128,41 +144,21 @@ class RobotState(State):
         return 'g'
         
     def get_cost(self):
-        # Euklidovo rastojanje
-        return ((self.position[0] - self.goal_position[0])**2 + (self.position[1] - self.goal_position[1])**2)**0.5  
-        
-        # Menhetn udaljenost     
-        # return abs(self.position[0] - self.goal_position[0]) + abs(self.position[1] - self.goal_position[1])
-        
+        # Rastojanje na mrezi (Chebyshev za kretanje sa dijagonalama, Menhetn za 4 smera) ili precica kroz portale
+        # (Euklidovo rastojanje precenjuje dijagonalne poteze i ne zna za portale, pa nije dopustivo)
+        return self.board.get_grid_estimate(self.position, self.goal_position, self.d_rows, self.d_cols)
+
     def get_current_cost(self):
         return self.depth
 
     def get_legal_positions(self):
-        # d_rows (delta rows), d_cols (delta columns)
-        # moguci smerovi kretanja robota (desno, levo, dole, gore)
-        
-        # TODO 5: Rijesen smijer kretanja robota - moze i dijagonalno
-        d_rows = [0, 0, 1, -1, -1, -1, 1, 1]
-        d_cols = [1, -1, 0, 0, -1, 1, -1, 1]
-
-        row, col = self.position  # trenutno pozicija
-        new_positions = []
-        for d_row, d_col in zip(d_rows, d_cols):  # za sve moguce smerove
-            new_row = row + d_row  # nova pozicija po redu
-            new_col = col + d_col  # nova pozicija po koloni
-            # ako nova pozicija nije van table i ako nije zid ('w'), ubaci u listu legalnih pozicija
-            if 0 <= new_row < self.board.rows and 0 <= new_col < self.board.cols and self.board.data[new_row][new_col] != 'w':
-                new_positions.append((new_row, new_col))
-                
-        # Provjeravamo da li je trenutna pozicija portal da bismo dodali i ta stanja...
-        # TODO 7: Implementirano pomijeranje sa portala na portal.
-        portal_positions = self.board.find_elements('p')
-        if self.position in portal_positions:
-            portal_positions.remove(self.position)
-            # Dodajemo samo razilicite portale od onog na kome smo.
-            new_positions.extend(portal_positions)
-            
-        return new_positions
+        # Legalne pozicije (susedna polja koja nisu van table i nisu zid, pa ostali portali)
+        # su vec izracunate u tabeli suseda table, pa je ovde samo isecak liste.
+        # TODO 7: Implementirano pomijeranje sa portala na portal (portali su u tabeli suseda).
+        offsets, neighbours = self.board.get_adjacency(self.d_rows, self.d_cols)
+        cols = self.board.cols
+        idx = self.position[0] * cols + self.position[1]
+        return [divmod(neighbour, cols) for neighbour in neighbours[offsets[idx]:offsets[idx + 1]]]
 
     def is_final_state(self):
         # Dodata informacija da mora posjedovati i sve kutije da bi bio final_state
@@ -171,5 +167,36 @@ class RobotState(State):
     def unique_hash(self):
         # Izmijenjen unique_hash zbog stanja
         # Dodat i spisak kutija koje je pokupio.
-        # Ne moze samo broj - bitno je koje je kutije pokupio.
-        return str(self.position) + str(self.picked_boxes)
+        # Ne moze samo broj - bitno je koje je kutije pokupio (zato maska, a ne broj kutija).
+        return self.key
+
+
+class OrthogonalRobotState(RobotState):
+    # robot se krece samo desno, levo, dole i gore
+    d_rows = [0, 0, 1, -1]
+    d_cols = [1, -1, 0, 0]
+
+    __slots__ = ()
+
+
+class DistanceRobotState(RobotState):
+    # heuristika je tacno rastojanje do cilja iz polja rastojanja table (racuna se jednom po tabli i cilju),
+    # pa i Greedy nalazi najkracu putanju
+    __slots__ = ()
+
+    def get_cost(self):
+        distances = self.board.get_distances(self.goal_position, self.d_rows, self.d_cols)
+        distance = distances[self.position[0] * self.board.cols + self.position[1]]
+        return distance if distance >= 0 else float('inf')
+
+
+class LandmarkRobotState(RobotState):
+    # heuristika je ALT granica preko orijentira - orijentiri se biraju jednom po tabli i vaze za bilo koji cilj,
+    # pa se isplati kada se cilj menja od upita do upita
+    landmarks_count = 8  # broj orijentira
+
+    __slots__ = ()
+
+    def get_cost(self):
+        return self.board.get_landmark_bound(self.position, self.goal_position,
+                                             self.landmarks_count, self.d_rows, self.d_cols)